@@ -0,0 +1,212 @@
+"""Execução do backup sem interface gráfica (cron, shell remoto, benchmarks de CI).
+
+Exemplo:
+    python cli.py --source /home/ana --destination /mnt/backup --ticket 1234 \\
+        --software-destination /mnt/backup/softwares --all-software
+
+O progresso sai em stdout como JSON, um evento por linha; mensagens de log
+vão para stderr. O resultado é registrado em backup_logs como na interface.
+Não importa Kivy nem tkinter."""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import sys
+import time
+
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime
+
+# Códigos de saída
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_CANCELLED = 130
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description='Backup de arquivos e transferência de softwares sem interface gráfica'
+    )
+    parser.add_argument('--source', required=True, help='Pasta de origem')
+    parser.add_argument('--destination', required=True, help='Pasta de destino')
+    parser.add_argument('--ticket', help='Número do chamado')
+    parser.add_argument('--user', default='admin', help='Usuário (username) registrado no histórico (padrão: admin)')
+    parser.add_argument('--incremental', action='store_true', help='Copia apenas arquivos novos ou alterados')
+    parser.add_argument('--exclude', action='append', default=[], metavar='PADRÃO',
+                        help='Regra de exclusão no estilo .gitignore (pode repetir)')
+    parser.add_argument('--no-default-excludes', action='store_true',
+                        help='Não aplica as exclusões padrão (lixeira, caches, temporários)')
+    parser.add_argument('--option', action='append', default=[], metavar='CHAVE=VALOR',
+                        help='Opção extra do backup_config; o valor é lido como JSON se possível '
+                             '(ex.: copy_engine=async, copy_workers=8)')
+    parser.add_argument('--software', action='append', default=[], metavar='ARQUIVO',
+                        help='Instalador a transferir (nome na pasta de softwares ou caminho; pode repetir)')
+    parser.add_argument('--all-software', action='store_true', help='Transfere todos os instaladores da pasta')
+    parser.add_argument('--software-dir', help='Pasta dos instaladores (padrão: SOFTWARE_INSTALLERS_PATH)')
+    parser.add_argument('--software-destination', help='Destino dos instaladores')
+    parser.add_argument('--log-dir', help='Pasta dos arquivos de log '
+                                          '(padrão: BLUEMACAW_LOG_DIR ou a pasta de logs da plataforma)')
+    args = parser.parse_args(argv)
+    if (args.software or args.all_software) and not args.software_destination:
+        parser.error('--software-destination é obrigatório ao transferir softwares')
+    return args
+
+
+def _option_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+class JsonLinesObserver:
+    """Escreve cada evento do backup como uma linha JSON e guarda o último
+    backup_completed e o último erro para o registro no histórico"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.completed = None
+        self.last_error = None
+
+    def update(self, event_type: str, data: dict):
+        if event_type == "backup_completed":
+            self.completed = data
+        elif event_type == "error":
+            self.last_error = data.get("message")
+        self.emit(event_type, data)
+
+    def emit(self, event_type: str, data: dict):
+        line = json.dumps({"event": event_type, "time": time.time(), **data}, ensure_ascii=False, default=str)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _resolve_user(username):
+    """user_id do usuário informado (o histórico exige um usuário)"""
+    from models.users_model import UserModel
+    user = UserModel.get_or_none(UserModel.username == username)
+    if user is None:
+        raise ValueError(f"Usuário não encontrado: {username}")
+    return user.user_id
+
+
+def _software_files(args):
+    from dotenv import load_dotenv
+    from controllers.manager.software_transfer import list_installers
+    load_dotenv()
+    software_dir = args.software_dir or os.environ.get('SOFTWARE_INSTALLERS_PATH', '')
+    if args.all_software:
+        return list_installers(software_dir)
+    files = []
+    for name in args.software:
+        file_path = name if os.path.isfile(name) else os.path.join(software_dir, name)
+        if not os.path.isfile(file_path):
+            raise ValueError(f"Instalador não encontrado: {name}")
+        files.append(file_path)
+    return files
+
+
+def run(args, out) -> int:
+    if args.log_dir:
+        # Antes de qualquer import que crie o LogManager
+        os.environ['BLUEMACAW_LOG_DIR'] = args.log_dir
+    from db import db_conn
+    from controllers.facade.backup_facade import BackupFacade
+    from controllers.manager.log_manager import LogManager
+    from controllers.manager.scan_filters import DEFAULT_EXCLUDES
+    from controllers.manager.software_transfer import copy_installers
+    from controllers.manager.user_session_manager import UserSessionManager
+
+    db_conn.init_db()
+    log_manager = LogManager()
+    observer = JsonLinesObserver(out)
+    try:
+        user_id = _resolve_user(args.user)
+        software = _software_files(args) if args.software or args.all_software else []
+    except ValueError as e:
+        observer.emit("error", {"error_type": "invalid_arguments", "message": str(e)})
+        return EXIT_USAGE
+
+    backup_config = {
+        'source_path': args.source,
+        'destination_path': args.destination,
+        'ticket_number': args.ticket,
+        'backup_type': 'incremental' if args.incremental else 'full',
+        'exclude': ([] if args.no_default_excludes else list(DEFAULT_EXCLUDES)) + args.exclude,
+        # Escrever em stdout (pipe) não deve segurar a cópia
+        'observer_dispatch': 'async'
+    }
+    for option in args.option:
+        key, _, value = option.partition('=')
+        backup_config[key.strip()] = _option_value(value)
+
+    facade = BackupFacade()
+    facade.attach_observer(observer)
+    # O histórico usa o usuário da sessão também nos backups interrompidos
+    UserSessionManager().set_user(user_id, args.user)
+
+    start_time = datetime.now()
+    future = facade.start_full_backup(backup_config)
+    # Ctrl+C / SIGTERM cancelam a cópia; o journal no destino permite retomar
+    previous_sigterm = signal.signal(signal.SIGTERM, lambda signum, frame: facade.cancel_backup())
+    try:
+        while True:
+            try:
+                backup_ok = future.result(timeout=0.5)
+                break
+            except KeyboardInterrupt:
+                facade.cancel_backup()
+            except FutureTimeout:
+                continue
+    finally:
+        signal.signal(signal.SIGTERM, previous_sigterm)
+        facade.manager.flush_observers()
+
+    if not backup_ok:
+        if facade.control.cancelled:
+            return EXIT_CANCELLED
+        log_manager.log_backup_error(user_id, 'files_only', observer.last_error or 'Erro desconhecido')
+        return EXIT_FAILED
+
+    data = observer.completed or {}
+    software_copied, software_size = 0, 0
+    if software:
+        software_copied, software_size = copy_installers(software, args.software_destination, observer.emit)
+
+    # Mesmo registro consolidado da interface: documentos + softwares
+    log_manager.log_backup_complete(
+        user_id=user_id,
+        backup_type='full' if software else 'files_only',
+        ticket_number=args.ticket,
+        duration=(datetime.now() - start_time).total_seconds(),
+        source_path=args.source,
+        destination_path=args.destination,
+        total_size=data.get('total_size', 0) + software_size,
+        total_files=data.get('total_files', 0) + software_copied,
+        copied_files=data.get('copied_files', 0) + software_copied,
+        skipped_files=data.get('skipped_files', 0),
+        compression_ratio=data.get('compression_ratio'),
+        compression_time=data.get('compression_time'),
+        copied_bytes=data.get('copied_bytes'),
+        copy_duration=data.get('copy_duration'),
+        status='Concluído'
+    )
+    observer.emit("backup_registered", {
+        "total_files": data.get('total_files', 0) + software_copied,
+        "software_files": software_copied
+    })
+    return EXIT_OK if software_copied == len(software) else EXIT_FAILED
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    out = sys.stdout
+    # Os prints do LogManager e do banco vão para stderr; stdout fica só com o JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        return run(args, out)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
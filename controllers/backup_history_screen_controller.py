@@ -53,6 +53,9 @@ class BackupHistoryScreenController(Screen):
                 
                 # Arquivos
                 files_str = f"{backup.copied_files}/{backup.total_files}" if backup.total_files else "N/A"
+                if backup.skipped_files:
+                    # Backup incremental: arquivos inalterados não foram copiados
+                    files_str += f" ({backup.skipped_files} inalt.)"
                 
                 # Nome do usuário - busca do banco de dados
                 try:
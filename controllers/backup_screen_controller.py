@@ -6,6 +6,7 @@ from tkinter import filedialog
 
 from kivy.uix.screenmanager import Screen
 from kivy.lang import Builder
+from kivy.clock import Clock
 
 from abc import ABC
 from datetime import datetime
@@ -13,7 +14,8 @@ from datetime import datetime
 from controllers.manager.user_session_manager import UserSessionManager
 from controllers.manager.backup_session_manager import BackupSessionManager
 from controllers.facade.backup_facade import BackupFacade
-from utils.observer import BackupLogObserver
+from controllers.manager.scan_filters import DEFAULT_EXCLUDES
+from utils.observer import BackupLogObserver, QueuedObserver
 # Para abrir seletor de pastas no Windows
 
 Builder.load_file('views/backup_view.kv')
@@ -22,7 +24,11 @@ class BackupScreenController(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.backup_facade = BackupFacade()
-        self.backup_facade.attach_observer(BackupLogObserver(self))
+        # O backup roda em segundo plano; os eventos são aplicados aos widgets
+        # pela fila drenada no Clock, sempre na thread da interface
+        self.ui_events = QueuedObserver(BackupLogObserver(self))
+        self.backup_facade.attach_observer(self.ui_events)
+        self._drain_event = None
         self.backup_session = BackupSessionManager()
         self.user_session = UserSessionManager()
         self.start_time = None
@@ -57,13 +63,52 @@ class BackupScreenController(Screen):
         # Configure and start backup
         backup_config = {
             'source_path': source_path,
-            'destination_path': dest_path
+            'destination_path': dest_path,
+            # Identifica a execução no journal para retomar um backup interrompido
+            'ticket_number': self.backup_session.ticket_number,
+            # Incremental copia apenas o que mudou desde o último backup neste destino
+            'backup_type': 'incremental' if self.ids.incremental_checkbox.active else 'full',
+            # Lixeira, caches de navegador, node_modules, temporários e arquivo de paginação
+            'exclude': DEFAULT_EXCLUDES
         }
         
-        backup_ok = self.backup_facade.execute_full_backup(backup_config)
-        
-        if backup_ok:
+        self.set_running(True)
+        if self._drain_event is None:
+            self._drain_event = Clock.schedule_interval(self.ui_events.drain, 1 / 60)
+        self.backup_facade.start_full_backup(backup_config)
+
+    def on_operation_finished(self, success):
+        """Chamado (na thread da interface) quando a execução em segundo plano termina"""
+        self.set_running(False)
+        if success:
             self.ids.next_button.disabled = False
+        if self._drain_event is not None:
+            self._drain_event.cancel()
+            self._drain_event = None
+
+    def set_running(self, running):
+        self.ids.start_button.disabled = running
+        self.ids.pause_button.disabled = not running
+        self.ids.cancel_button.disabled = not running
+        self.ids.pause_button.text = 'Pausar'
+
+    def toggle_pause(self):
+        if self.backup_facade.control.paused:
+            self.backup_facade.resume_backup()
+            self.ids.pause_button.text = 'Pausar'
+        else:
+            self.backup_facade.pause_backup()
+            self.ids.pause_button.text = 'Retomar'
+
+    def cancel_backup(self):
+        self.backup_facade.cancel_backup()
+
+    def shutdown(self):
+        """Chamado ao fechar a aplicação: cancela o backup em andamento"""
+        if self._drain_event is not None:
+            self._drain_event.cancel()
+            self._drain_event = None
+        self.backup_facade.shutdown()
 
     def go_to_software_selection(self):
         """Navega para a tela de seleção de software"""
@@ -82,6 +127,7 @@ class BackupScreenController(Screen):
             'connectivity_status': ('Verificando conectividade...', (.6, .6, .6, 1)),
             'env_ready_status': ('Ambiente não verificado', (.6, .6, .6, 1)),
             'files_count_status': ('Total de arquivos: Calculando...', (.6, .6, .6, 1)),
+            'plan_status': ('Espaço e tempo estimado: aguardando contagem...', (.6, .6, .6, 1)),
             'copy_status': ('Aguardando início da cópia...', (.6, .6, .6, 1)),
             'progress_status': ('Progresso: 0%', (.6, .6, .6, 1)),
             'validation_status': ('Validação pendente', (.6, .6, .6, 1)),
@@ -1,18 +1,63 @@
+from ..manager.backup_control import BackupCancelled
 from ..manager.backup_manager import BackupManager
+from ..manager.user_session_manager import UserSessionManager
+import os
 import time
 
+from concurrent.futures import Future, ThreadPoolExecutor
+
 class BackupFacade:
     def __init__(self):
         self.manager = BackupManager()
+        # Token de pausa/cancelamento consultado pelos laços do manager
+        self.control = self.manager.control
+        # Uma execução por vez, fora da thread da interface
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='backup')
 
     def attach_observer(self, observer):
         self.manager.attach(observer)
 
+    def start_full_backup(self, backup_config: dict) -> Future:
+        """Executa execute_full_backup em segundo plano. Os eventos chegam aos
+        observadores na thread do backup; o fim é notificado por operation_finished"""
+        return self._executor.submit(self._run_in_background, self.execute_full_backup, backup_config)
+
+    def start_restore(self, backup_log, target_path: str = None, patterns: list = None) -> Future:
+        return self._executor.submit(self._run_in_background, self.execute_restore, backup_log, target_path, patterns)
+
+    def _run_in_background(self, operation, *args) -> bool:
+        success = False
+        try:
+            success = operation(*args)
+        finally:
+            self.manager._notify_observers("operation_finished", {"success": success})
+        return success
+
+    def pause_backup(self):
+        self.control.pause()
+        self.manager._notify_observers("backup_paused", {})
+
+    def resume_backup(self):
+        self.control.resume()
+        self.manager._notify_observers("backup_resumed", {})
+
+    def cancel_backup(self):
+        self.control.cancel()
+
+    def shutdown(self):
+        """Encerra a execução em segundo plano (ao fechar a aplicação). O
+        cancelamento também libera um backup pausado"""
+        self.cancel_backup()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
     def execute_full_backup(self, backup_config: dict) -> bool:
+        self.control.reset()
+        start_time = time.time()
+        total_files, total_size = 0, 0
         try:
             self.manager._notify_observers("backup_started", {"progress": 0})
             
-            start_time = time.time()
+            self.manager._load_options(backup_config)
             
             # Etapa 1: Checando conectividade e acesso as pastas
             if not self.manager._check_connectivity(backup_config):
@@ -24,8 +69,18 @@ class BackupFacade:
             # Etapa 2: Contagem de arquivos e tamanho total
             total_files, total_size = self.manager._count_files(source_path)
             
+            # Etapa 2.1: Planejamento (espaço livre no destino e duração prevista)
+            self.manager._plan_backup(source_path, destination_path)
+            
             # Etapa 3: Iniciar cópia
-            self.manager._copy_files(source_path, destination_path, total_files)
+            try:
+                self.manager._copy_files(source_path, destination_path, total_files)
+            except BackupCancelled:
+                raise
+            except Exception:
+                # O journal no destino permite retomar; registra a tentativa interrompida
+                self._register_interrupted(backup_config, time.time() - start_time, total_files, total_size)
+                raise
             
             # Etapa 4: Validar os arquivos copiados
             self.manager._validate_backup(source_path, destination_path)
@@ -36,10 +91,28 @@ class BackupFacade:
             self.manager._notify_observers("backup_completed", {
                 "duration": duration,
                 "total_files": total_files,
-                "total_size": total_size
+                "total_size": total_size,
+                "backup_type": self.manager.backup_type,
+                "copied_files": self.manager.files_copied,
+                "skipped_files": self.manager.files_skipped,
+                "deleted_files": len(self.manager.deleted_files),
+                "compression_ratio": self.manager.compression_ratio(),
+                "compression_time": self.manager.compression_stats['seconds'],
+                "copied_bytes": self.manager.bytes_copied,
+                "copy_duration": self.manager.copy_duration,
+                **self.manager.excluded_stats()
             })
             
             return True
+        except BackupCancelled:
+            # Cancelado na varredura, cópia ou validação: registra as contagens parciais
+            self._register_interrupted(backup_config, time.time() - start_time, total_files, total_size)
+            self.manager._notify_observers("backup_cancelled", {
+                "duration": time.time() - start_time,
+                "total_files": total_files,
+                "copied_files": self.manager.files_copied
+            })
+            return False
         except Exception as e:
             error_type = "unknown"
             if "conectividade" in str(e):
@@ -54,4 +127,55 @@ class BackupFacade:
                 "message": str(e)
             })
             
-            return False
\ No newline at end of file
+            return False
+
+    def execute_restore(self, backup_log, target_path: str = None, patterns: list = None) -> bool:
+        """Restaura um backup do histórico (BackupLog) em target_path, por padrão a
+        origem original. `patterns` seleciona arquivos por glob (ex.: 'Documentos/*.docx')"""
+        self.control.reset()
+        try:
+            self.manager._notify_observers("restore_started", {"progress": 0})
+            start_time = time.time()
+            backup_path = backup_log.destination_path
+            target_path = target_path or backup_log.source_path
+            
+            if not backup_path or not os.path.isdir(backup_path):
+                raise ValueError("Pasta do backup não encontrada ou sem conectividade")
+            
+            # Só o backup desta origem, gravado até o fim registrado no histórico
+            restored, failed = self.manager._restore_files(
+                backup_path, target_path, backup_log.source_path, backup_log.end_time, patterns
+            )
+            
+            self.manager._notify_observers("restore_completed", {
+                "duration": time.time() - start_time,
+                "restored_files": restored,
+                "failed_files": len(failed),
+                "target_path": target_path
+            })
+            return not failed
+        except BackupCancelled:
+            self.manager._notify_observers("backup_cancelled", {})
+            return False
+        except Exception as e:
+            self.manager._notify_observers("error", {
+                "error_type": "connection_lost" if "conectividade" in str(e) else "unknown",
+                "message": str(e)
+            })
+            return False
+
+    def _register_interrupted(self, backup_config: dict, duration: float, total_files: int, total_size: int):
+        """Registra no histórico um backup interrompido com as contagens parciais"""
+        self.manager.log_manager.log_backup_complete(
+            user_id=UserSessionManager().user_id,
+            backup_type='files_only',
+            ticket_number=backup_config.get('ticket_number'),
+            duration=duration,
+            source_path=backup_config.get('source_path'),
+            destination_path=backup_config.get('destination_path'),
+            total_size=total_size,
+            total_files=total_files,
+            copied_files=self.manager.files_copied,
+            skipped_files=self.manager.files_skipped,
+            status='Interrompido'
+        )
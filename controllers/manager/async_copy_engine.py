@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from .backup_control import BackupCancelled
+
+# Mensagens trocadas entre as etapas: início de arquivo, bloco de dados,
+# fim do arquivo (com o hash) e falha de leitura; None encerra a etapa
+_START, _DATA, _END, _ERROR = range(4)
+
+
+class AsyncCopyPipeline:
+    """Motor de cópia alternativo com asyncio.
+
+    Leitura, hash e gravação são etapas separadas ligadas por filas limitadas,
+    cada uma com seu executor para as chamadas bloqueantes: a leitura do
+    arquivo N+1 acontece enquanto o arquivo N ainda está sendo gravado.
+    Arquivos que exigem tratamento especial (packs, chunks, hardlinks,
+    compressão, esparsos, delta) seguem pelo _copy_task do BackupManager."""
+
+    def __init__(self, manager, digest_size: int = 32):
+        self.manager = manager
+        self.digest_size = digest_size
+        self.chunk_size = manager.copy_buffer_size
+        # As duas filas juntas ficam dentro do orçamento de bytes em trânsito
+        self.queue_size = max(2, manager.max_in_flight_bytes // self.chunk_size // 2)
+        self._created_dirs = set()
+
+    def run(self, entries: List, source_path: str, dest_path: str, record) -> None:
+        """Copia `entries` chamando record(entry, source_file, error, result) a cada arquivo"""
+        asyncio.run(self._run(entries, source_path, dest_path, record))
+
+    def _streams(self, entry, dest_file: str) -> bool:
+        """Arquivo comum em árvore, copiado bloco a bloco pelas etapas"""
+        manager = self.manager
+        return (
+            manager.chunk_store is None
+            and manager._writes_tree(entry)
+            and entry.rel_path not in manager.link_sources
+            and manager.compression is None
+            and not (entry.is_sparse and hasattr(os, 'SEEK_DATA'))
+            and not manager._use_delta(entry, dest_file)
+        )
+
+    def _prepare(self, entry, source_file: str, dest_file: str):
+        """Executado no executor de leitura: pausa/cancelamento, pasta de destino,
+        escolha do caminho e abertura da origem (None para arquivos especiais)"""
+        self.manager.control.checkpoint()
+        self.manager._prepare_dest_dir(entry, dest_file, self._created_dirs)
+        if not self._streams(entry, dest_file):
+            return None
+        return open(source_file, 'rb', 0)
+
+    async def _run(self, entries: List, source_path: str, dest_path: str, record) -> None:
+        init = self.manager._init_worker
+        digest_queue = asyncio.Queue(self.queue_size)
+        write_queue = asyncio.Queue(self.queue_size)
+        with ThreadPoolExecutor(1, initializer=init) as read_pool, \
+                ThreadPoolExecutor(1) as digest_pool, \
+                ThreadPoolExecutor(1, initializer=init) as write_pool, \
+                ThreadPoolExecutor(1) as record_pool, \
+                ThreadPoolExecutor(self.manager.copy_workers, initializer=init) as task_pool:
+            loop = asyncio.get_running_loop()
+
+            async def record_async(*args):
+                # O registro grava o journal (fsync): fora da thread do loop, um por vez
+                await loop.run_in_executor(record_pool, record, *args)
+
+            await asyncio.gather(
+                self._read_stage(entries, source_path, dest_path, record_async, digest_queue, read_pool, task_pool),
+                self._digest_stage(digest_queue, write_queue, digest_pool),
+                self._write_stage(write_queue, record_async, write_pool)
+            )
+
+    async def _read_stage(self, entries, source_path, dest_path, record, out_queue, read_pool, task_pool):
+        loop = asyncio.get_running_loop()
+        # Arquivos especiais em paralelo, limitados como no motor de threads
+        slots = asyncio.Semaphore(self.manager.copy_workers * 4)
+        tasks = set()
+        for entry in entries:
+            source_file = os.path.join(source_path, entry.rel_path)
+            dest_file = os.path.join(dest_path, entry.rel_path)
+            # A origem é aberta antes de o destino ser criado: se falhar, a cópia
+            # anterior no destino fica intacta
+            try:
+                src = await loop.run_in_executor(read_pool, self._prepare, entry, source_file, dest_file)
+            except BackupCancelled:
+                raise
+            except Exception as e:
+                await record(entry, source_file, e, None)
+                continue
+
+            if src is None:
+                await slots.acquire()
+                task = loop.create_task(self._copy_whole(entry, source_file, dest_file, record, task_pool))
+                task.add_done_callback(lambda done: slots.release())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                continue
+
+            await out_queue.put((_START, entry, source_file, dest_file))
+            try:
+                try:
+                    while True:
+                        data = await loop.run_in_executor(read_pool, src.read, self.chunk_size)
+                        if not data:
+                            break
+                        await out_queue.put((_DATA, data))
+                finally:
+                    await loop.run_in_executor(read_pool, src.close)
+            except Exception as e:
+                await out_queue.put((_ERROR, e))
+                continue
+            await out_queue.put((_END, None))
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        await out_queue.put(None)
+
+    async def _copy_whole(self, entry, source_file, dest_file, record, task_pool):
+        loop = asyncio.get_running_loop()
+        _, _, _, error, result = await loop.run_in_executor(
+            task_pool, self.manager._copy_task, entry, source_file, dest_file, 0
+        )
+        await record(entry, source_file, error, result)
+
+    async def _digest_stage(self, in_queue, out_queue, digest_pool):
+        loop = asyncio.get_running_loop()
+        digest = None
+        while True:
+            message = await in_queue.get()
+            if message is None:
+                await out_queue.put(None)
+                return
+            kind = message[0]
+            if kind == _START:
+                digest = hashlib.blake2b(digest_size=self.digest_size) \
+                    if self.manager.validation == 'digest' else None
+            elif kind == _DATA and digest is not None:
+                # O hashlib libera o GIL em blocos grandes
+                await loop.run_in_executor(digest_pool, digest.update, message[1])
+            elif kind == _END:
+                message = (_END, digest.hexdigest() if digest is not None else None)
+            await out_queue.put(message)
+
+    def _write_block(self, dst, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[dst.write(view):]
+        self.manager._throttle(len(data))
+
+    async def _write_stage(self, in_queue, record, write_pool):
+        loop = asyncio.get_running_loop()
+        entry = source_file = dst = error = None
+        while True:
+            message = await in_queue.get()
+            if message is None:
+                return
+            kind = message[0]
+            if kind == _START:
+                entry, source_file, dest_file = message[1:]
+                dst = error = None
+                try:
+                    dst = await loop.run_in_executor(write_pool, open, dest_file, 'wb', 0)
+                except OSError as e:
+                    error = e
+            elif kind == _DATA:
+                # Após uma falha de gravação os blocos restantes do arquivo são descartados
+                if error is None:
+                    try:
+                        await loop.run_in_executor(write_pool, self._write_block, dst, message[1])
+                    except OSError as e:
+                        error = e
+            else:
+                if dst is not None:
+                    try:
+                        await loop.run_in_executor(write_pool, dst.close)
+                    except OSError as e:
+                        error = error or e
+                if kind == _ERROR:
+                    error = message[1]
+                if error is not None:
+                    await record(entry, source_file, error, None)
+                else:
+                    await record(entry, source_file, None, {'digest': message[1]})
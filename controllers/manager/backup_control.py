@@ -0,0 +1,48 @@
+import threading
+
+
+class BackupCancelled(Exception):
+    """Execução cancelada pelo usuário"""
+
+
+class BackupControl:
+    """Token de controle compartilhado entre a interface e o motor de cópia.
+
+    Os laços de varredura, cópia e validação chamam checkpoint() entre
+    arquivos e entre blocos: em pausa a chamada bloqueia (nada é fechado,
+    a vazão só fica em zero); após cancel() ela levanta BackupCancelled."""
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = False
+
+    def reset(self) -> None:
+        """Prepara o token para uma nova execução"""
+        self._cancelled = False
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def pause(self) -> None:
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        # Acorda quem está esperando em pausa para que encerre
+        self._running.set()
+
+    def checkpoint(self) -> None:
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled:
+            raise BackupCancelled("Backup cancelado pelo usuário")
@@ -1,7 +1,132 @@
+import errno
+import fnmatch
+import hashlib
+import json
+import lzma
 import os
-from typing import Dict
+import queue
+import re
+import shutil
+import stat as stat_module
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+from .async_copy_engine import AsyncCopyPipeline
+from .backup_control import BackupCancelled, BackupControl
+from .chunk_store import ChunkStore, ChunkStoreReader, source_key
+from .compression import CODECS, codec_suffix, is_compressible, iter_decompressed, new_compressor
+from .copy_journal import CopyJournal
+from .destination_probe import probe_destination
+from .dirty_paths import DirtyPathStore
 from .log_manager import LogManager
-from utils.observer import BackupSubject
+from .pack_archive import PackReader, PackWriter
+from .parallel_digest import compute_digests, file_digest
+from .progress_reporter import DEFAULT_PROGRESS_RATE, ProgressReporter
+from .scan_filters import ScanFilter
+from .throttle import RateLimiter, lower_thread_priority
+from utils.observer import DEFAULT_DISPATCH_QUEUE_SIZE, BackupSubject
+
+# Tamanho padrão do buffer reutilizado na cópia em blocos (memória não depende do
+# arquivo); por execução pode ser escolhido pelo benchmark do destino
+COPY_BUFFER_SIZE = 1024 * 1024
+# Padrões do motor de cópia paralelo (sobrescritos via backup_config)
+DEFAULT_COPY_WORKERS = 4
+DEFAULT_MAX_IN_FLIGHT_MB = 256
+# Motores de cópia: 'threads' (cada worker lê e grava um arquivo inteiro) ou
+# 'async' (etapas de leitura, hash e gravação sobrepostas via asyncio)
+COPY_ENGINES = ('threads', 'async')
+# Manifesto persistido no destino para a comparação do backup incremental
+MANIFEST_FILENAME = '.bluemacaw_manifest.json'
+# Validação: 'digest' confere o conteúdo pelo hash calculado durante a cópia,
+# 'size' apenas o tamanho (permite a cópia pelo kernel, sem passar pelo buffer)
+VALIDATION_MODES = ('digest', 'size')
+DIGEST_SIZE = 32
+MAX_REPORTED_ERRORS = 10
+# Transferência delta: arquivos alterados acima do limite que já existem no
+# destino são regravados só nos blocos que mudaram
+DEFAULT_DELTA_THRESHOLD_MB = 64
+DELTA_BLOCK_SIZE = 64 * 1024
+# Folga exigida no destino além dos dados (manifestos, journal, metadados)
+SPACE_OVERHEAD_RATIO = 0.05
+SPACE_OVERHEAD_BYTES = 64 * 1024 * 1024
+# Formatos de destino: árvore de arquivos comum, repositório deduplicado,
+# snapshots datados com hardlinks para os arquivos inalterados ou arquivos
+# pequenos empacotados em poucos packs com índice
+DESTINATION_FORMATS = ('tree', 'chunked', 'snapshot', 'packed')
+# No formato 'packed', arquivos abaixo deste tamanho vão para os packs
+DEFAULT_PACK_THRESHOLD_KB = 1024
+# Com microssegundos: duas execuções no mesmo segundo não dividem a pasta.
+# Snapshots antigos, nomeados só até o segundo, continuam reconhecidos
+SNAPSHOT_NAME_FORMAT = '%Y-%m-%d_%H%M%S_%f'
+_SNAPSHOT_SECONDS_FORMAT = '%Y-%m-%d_%H%M%S'
+_SNAPSHOT_NAME_RE = re.compile(r'^\d{4}-\d{2}-\d{2}_\d{6}(_\d{6})?$')
+# Erros que indicam que a cópia pelo kernel não é suportada entre os dois arquivos
+_ZERO_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF}
+
+# Arquivos esparsos: só vale percorrer as extensões de dados acima deste tamanho
+SPARSE_MIN_SIZE = 1024 * 1024
+_ZERO_BLOCK = memoryview(bytes(COPY_BUFFER_SIZE))
+
+class ManifestEntry(NamedTuple):
+    """Arquivo encontrado na varredura da origem"""
+    rel_path: str
+    size: int  # Tamanho lógico
+    mtime: float
+    is_symlink: bool
+    disk_size: int = -1  # Espaço alocado (st_blocks), -1 se não disponível
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.size >= SPARSE_MIN_SIZE and 0 <= self.disk_size < self.size
+
+    @property
+    def data_size(self) -> int:
+        """Bytes que realmente precisam ser lidos/gravados (sem os buracos)"""
+        return self.disk_size if self.is_sparse else self.size
+
+def scan_tree(path: str, rel_root: str = "", dirs: List[str] = None, scan_filter=None,
+              control=None) -> List[ManifestEntry]:
+    """Percorre path (a partir da subpasta rel_root) com os.scandir montando o
+    manifesto. Se `dirs` for informado, recebe as pastas encontradas; com
+    scan_filter, pastas excluídas não são percorridas"""
+    manifest = []
+    pending = [rel_root]
+    
+    while pending:
+        rel_dir = pending.pop()
+        try:
+            with os.scandir(os.path.join(path, rel_dir)) as entries:
+                for entry in entries:
+                    if control is not None:
+                        control.checkpoint()
+                    rel_path = os.path.join(rel_dir, entry.name)
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if scan_filter is not None and scan_filter.skip_dir(rel_path):
+                                continue
+                            pending.append(rel_path)
+                            if dirs is not None:
+                                dirs.append(rel_path)
+                        elif entry.is_file():
+                            # stat() segue links simbólicos, como o open() da cópia
+                            stat = entry.stat()
+                            if scan_filter is not None and scan_filter.skip_file(rel_path, stat.st_size, stat.st_mtime):
+                                continue
+                            blocks = getattr(stat, 'st_blocks', None)
+                            manifest.append(ManifestEntry(
+                                rel_path, stat.st_size, stat.st_mtime, entry.is_symlink(),
+                                blocks * 512 if blocks is not None else -1
+                            ))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+            
+    return manifest
 
 class BackupManager(BackupSubject):
     def __init__(self):
@@ -9,6 +134,82 @@ class BackupManager(BackupSubject):
         self.log_manager = LogManager()
         self.backup_progress = 0
         self.current_operation = ""
+        # Manifesto montado em _count_files e reutilizado na cópia e validação
+        self.manifest: List[ManifestEntry] = []
+        # Cada worker mantém seu próprio buffer de cópia, evitando alocação por arquivo
+        self._thread_local = threading.local()
+        self.copy_workers = DEFAULT_COPY_WORKERS
+        self.copy_buffer_size = COPY_BUFFER_SIZE
+        self.copy_engine = 'threads'
+        # Eventos progress_update por segundo; progress_debug emite também file_copied
+        self.progress_rate = DEFAULT_PROGRESS_RATE
+        self.progress_debug = False
+        # Resultado do benchmark do destino e parâmetros escolhidos para a execução
+        self.tuning: Dict = {}
+        self.max_in_flight_bytes = DEFAULT_MAX_IN_FLIGHT_MB * 1024 * 1024
+        self.backup_type = 'full'
+        self.destination_format = 'tree'
+        self.chunk_store = None
+        # Receita do backup deduplicado (arquivo -> chunks), montada durante a cópia
+        self.recipe_files: Dict[str, Dict] = {}
+        # Snapshot desta execução e o anterior, usado como base para os hardlinks
+        self.snapshot_path = None
+        self.previous_snapshot = None
+        self.link_sources: Dict[str, str] = {}
+        # Formato 'packed': gravador dos packs e índice (arquivo -> pack, offset, ...)
+        self.pack_writer = None
+        self.pack_threshold = DEFAULT_PACK_THRESHOLD_KB * 1024
+        self.pack_index: Dict[str, Dict] = {}
+        self.validation = 'digest'
+        # Validação por hash em paralelo: threads (ou processos) e quantidade
+        self.validation_workers = None
+        self.validation_pool = None
+        self.delta_threshold = DEFAULT_DELTA_THRESHOLD_MB * 1024 * 1024
+        # Estatística da transferência delta (arquivos e bytes efetivamente regravados)
+        self.delta_files = 0
+        self.delta_bytes_written = 0
+        # Hash (BLAKE2b) de cada arquivo, calculado durante a cópia
+        self.file_digests: Dict[str, str] = {}
+        self.previous_digests: Dict[str, str] = {}
+        # Compressão opcional por arquivo (codec da biblioteca padrão ou None)
+        self.compression = None
+        self.compression_level = None
+        # Arquivos gravados comprimidos (arquivo -> codec e tamanho gravado)
+        self.compressed_files: Dict[str, Dict] = {}
+        self.previous_compressed: Dict[str, Dict] = {}
+        # Codec (ou None) de cada arquivo no manifesto anterior do destino e
+        # arquivos da origem: evitam que a versão comprimida ocupe o nome de outro
+        # arquivo e permitem remover a versão antiga quando a compressão muda
+        self.previous_codecs: Dict[str, Optional[str]] = {}
+        self.manifest_paths: set = set()
+        self.compression_stats = {'original': 0, 'stored': 0, 'seconds': 0.0}
+        # Resultado da última cópia (copiados, inalterados e removidos da origem)
+        self.files_copied = 0
+        self.files_skipped = 0
+        self.deleted_files: List[str] = []
+        # Bytes copiados e duração da etapa de cópia (base da vazão do histórico)
+        self.bytes_copied = 0
+        self.copy_duration = 0.0
+        # Retomada: identificação da execução (origem/destino, também usados para
+        # identificar a origem nos manifestos) e quantos arquivos vieram do journal
+        self.journal_header: Dict = {}
+        self.files_resumed = 0
+        # Limite de banda (token bucket) e prioridade reduzida dos workers
+        self.rate_limiter = RateLimiter()
+        self.low_priority = False
+        # Pausa/retomada/cancelamento, verificado entre arquivos e entre blocos
+        self.control = BackupControl()
+        # Plano calculado em _plan_backup e consumido por _copy_files
+        self.copy_plan = None
+        # Caminhos alterados registrados pelo watcher e início da varredura,
+        # gravado no manifesto
+        self.use_watcher = True
+        # Regras de inclusão/exclusão da varredura (None = todos os arquivos)
+        self.scan_filter = None
+        self.scan_started = None
+        # Restauração: raiz do backup e leitores de packs/chunks
+        self.restore_source: Dict = {}
+        self._zero_copy_enabled = sys.platform.startswith('linux')
         
     def _check_connectivity(self, backup_config: Dict) -> bool:
         # Verifica conectividade e permissões dos diretórios
@@ -29,11 +230,14 @@ class BackupManager(BackupSubject):
                 with open(test_file, 'w') as f:
                     f.write('test')
                 os.remove(test_file)
-                # Notificar ambiente pronto
-                self._notify_observers("environment_ready", {})
             except Exception:
                 raise ValueError("Sem permissão de escrita no destino")
-                
+
+            # Com limite de banda o benchmark gravaria sem limite; mantém os padrões
+            if backup_config.get('auto_tune', True) and not self.rate_limiter.enabled:
+                self._tune_copy(backup_config)
+            # Notificar ambiente pronto
+            self._notify_observers("environment_ready", {})
             return True
         except Exception as e:
             self._notify_observers("error", {
@@ -42,6 +246,30 @@ class BackupManager(BackupSubject):
             })
             return False
 
+    def _tune_copy(self, backup_config: Dict) -> None:
+        """Escolhe workers e tamanho de buffer pelo benchmark do destino.
+        Valores definidos explicitamente no backup_config têm precedência"""
+        try:
+            self.tuning = probe_destination(backup_config.get('destination_path'))
+        except OSError as e:
+            self.log_manager.log_warning(f"Benchmark do destino falhou, mantendo padrões: {e}")
+            self.tuning = {}
+            return
+        if 'copy_workers' not in backup_config and 'copy_workers' in self.tuning:
+            self.copy_workers = self.tuning['copy_workers']
+        if 'copy_buffer_kb' not in backup_config and 'copy_buffer_size' in self.tuning:
+            self.copy_buffer_size = self.tuning['copy_buffer_size']
+        self.log_manager.log_info(
+            f"Parâmetros de cópia: {self.copy_workers} worker(s), buffer de "
+            f"{self.copy_buffer_size // 1024} KB (criação de arquivo: "
+            f"{self.tuning.get('create_latency_ms', 0):.1f} ms, escrita sequencial: "
+            f"{self.tuning.get('write_throughput', 0) / (1024 * 1024):.1f} MB/s)"
+        )
+
+    def _scan_source(self, path: str, rel_root: str = "") -> List[ManifestEntry]:
+        """Percorre a origem uma única vez com os.scandir montando o manifesto"""
+        return scan_tree(path, rel_root, scan_filter=self.scan_filter, control=self.control)
+
     def _count_files(self, path: str) -> tuple:
         """Conta arquivos e calcula tamanho total"""
         total_files = 0
@@ -52,88 +280,1170 @@ class BackupManager(BackupSubject):
             "total_size": total_size / (1024 * 1024 * 1024)  # Converter para GB
         })
         
-        for root, _, files in os.walk(path):
-            total_files += len(files)
-            for name in files:
-                try:
-                    total_size += os.path.getsize(os.path.join(root, name))
-                except OSError:
-                    continue
+        # Incremental com watcher ativo: só os caminhos alterados são consultados
+        self.scan_started = time.time()
+        if self.scan_filter is not None:
+            self.scan_filter.reset_stats()
+        manifest = self._dirty_manifest(path)
+        self.manifest = manifest if manifest is not None else self._scan_source(path)
+        total_files = len(self.manifest)
+        total_size = sum(entry.size for entry in self.manifest)
+        excluded = self.excluded_stats()
+        if excluded['excluded_files'] or excluded['excluded_dirs']:
+            self.log_manager.log_info(
+                f"Regras de exclusão: {excluded['excluded_files']} arquivo(s) "
+                f"({excluded['excluded_size'] / (1024 * 1024):.2f} MB) e "
+                f"{excluded['excluded_dirs']} pasta(s) ignorados"
+            )
                 
         self._notify_observers("counting_files", {
             "total_files": total_files,
-            "total_size": total_size / (1024 * 1024 * 1024)  # Converter para GB
+            "total_size": total_size / (1024 * 1024 * 1024),  # Converter para GB
+            **excluded
         })
                 
         return total_files, total_size
     
+    def excluded_stats(self) -> Dict:
+        """Arquivos e bytes ignorados pelas regras na última varredura (pastas
+        excluídas não são percorridas, então seu conteúdo não entra na conta)"""
+        scan_filter = self.scan_filter
+        return {
+            "excluded_files": scan_filter.excluded_files if scan_filter is not None else 0,
+            "excluded_size": scan_filter.excluded_bytes if scan_filter is not None else 0,
+            "excluded_dirs": scan_filter.excluded_dirs if scan_filter is not None else 0
+        }
+
+    def _dirty_manifest(self, path: str):
+        """Monta o manifesto a partir do manifesto anterior e dos caminhos alterados
+        registrados pelo watcher. Retorna None se for preciso varrer a origem"""
+        if self.backup_type != 'incremental' or not self.use_watcher:
+            return None
+        manifest_root = self.previous_snapshot if self.snapshot_path is not None \
+            else self.journal_header.get('destination_path')
+        previous = self._read_manifest_file(manifest_root) if manifest_root else {}
+        if previous.get('scanned_at') is None or previous.get('filters') != self._filter_fingerprint():
+            return None
+        
+        store = DirtyPathStore(path)
+        try:
+            dirty = store.snapshot(self.journal_header.get('destination_path'), previous['scanned_at'])
+        except Exception as e:
+            self.log_manager.log_warning(f"Caminhos alterados indisponíveis: {str(e)}")
+            return None
+        if dirty is None:
+            return None
+        
+        entries = {
+            rel_path: ManifestEntry(rel_path, size, mtime, False)
+            for rel_path, (size, mtime) in previous.get('files', {}).items()
+        }
+        # Arquivos só precisam de um stat; pastas (novas, movidas ou removidas) são varridas
+        removed_dirs = []
+        rescan_dirs = []
+        for rel_path in dirty:
+            if self.scan_filter is not None and self.scan_filter.in_excluded_dir(rel_path):
+                continue
+            try:
+                stat = os.stat(os.path.join(path, rel_path))
+            except OSError:
+                entries.pop(rel_path, None)
+                removed_dirs.append(rel_path)
+                continue
+            if stat_module.S_ISDIR(stat.st_mode):
+                removed_dirs.append(rel_path)
+                if self.scan_filter is None or not self.scan_filter.skip_dir(rel_path):
+                    rescan_dirs.append(rel_path)
+                continue
+            if self.scan_filter is not None and self.scan_filter.skip_file(rel_path, stat.st_size, stat.st_mtime):
+                entries.pop(rel_path, None)
+                continue
+            blocks = getattr(stat, 'st_blocks', None)
+            entries[rel_path] = ManifestEntry(
+                rel_path, stat.st_size, stat.st_mtime, os.path.islink(os.path.join(path, rel_path)),
+                blocks * 512 if blocks is not None else -1
+            )
+        if removed_dirs:
+            prefixes = tuple(rel_dir + os.sep for rel_dir in removed_dirs)
+            entries = {rel_path: entry for rel_path, entry in entries.items() if not rel_path.startswith(prefixes)}
+        for rel_dir in rescan_dirs:
+            for entry in self._scan_source(path, rel_dir):
+                entries[entry.rel_path] = entry
+        
+        self.log_manager.log_info(
+            f"Varredura pelo watcher: {len(dirty)} caminho(s) alterado(s), {len(rescan_dirs)} pasta(s) varrida(s)"
+        )
+        return list(entries.values())
+
+    def _filter_fingerprint(self):
+        return self.scan_filter.fingerprint if self.scan_filter is not None else None
+
+    def _load_options(self, backup_config: Dict) -> None:
+        """Lê do backup_config as opções do motor de cópia"""
+        self.files_copied = 0
+        self.files_skipped = 0
+        self.bytes_copied = 0
+        self.copy_duration = 0.0
+        self.copy_workers = max(1, int(backup_config.get('copy_workers', DEFAULT_COPY_WORKERS)))
+        self.copy_buffer_size = max(4, int(backup_config.get('copy_buffer_kb', COPY_BUFFER_SIZE // 1024))) * 1024
+        self.tuning = {}
+        self.copy_engine = backup_config.get('copy_engine', 'threads')
+        if self.copy_engine not in COPY_ENGINES:
+            raise ValueError(f"Motor de cópia inválido: {self.copy_engine}")
+        max_in_flight_mb = backup_config.get('max_in_flight_mb', DEFAULT_MAX_IN_FLIGHT_MB)
+        self.max_in_flight_bytes = max(1, int(max_in_flight_mb * 1024 * 1024))
+        self.backup_type = backup_config.get('backup_type', 'full')
+        if self.backup_type not in ('full', 'incremental'):
+            raise ValueError(f"Tipo de backup inválido: {self.backup_type}")
+        self.destination_format = backup_config.get('destination_format', 'tree')
+        if self.destination_format not in DESTINATION_FORMATS:
+            raise ValueError(f"Formato de destino inválido: {self.destination_format}")
+        self.validation = backup_config.get('validation', 'digest')
+        if self.validation not in VALIDATION_MODES:
+            raise ValueError(f"Modo de validação inválido: {self.validation}")
+        self.validation_workers = backup_config.get('validation_workers')
+        self.validation_pool = backup_config.get('validation_pool')
+        if self.validation_pool not in (None, 'process', 'thread'):
+            raise ValueError(f"Pool de validação inválido: {self.validation_pool}")
+        # None desativa a transferência delta
+        delta_threshold_mb = backup_config.get('delta_threshold_mb', DEFAULT_DELTA_THRESHOLD_MB)
+        self.delta_threshold = None if delta_threshold_mb is None else int(delta_threshold_mb * 1024 * 1024)
+        self.compression = backup_config.get('compression')
+        if self.compression is not None and self.compression not in CODECS:
+            raise ValueError(f"Compressão inválida: {self.compression}")
+        self.compression_level = backup_config.get('compression_level')
+        self.rate_limiter = RateLimiter(
+            backup_config.get('bandwidth_limit_mbps'), backup_config.get('bandwidth_schedule')
+        )
+        self.low_priority = bool(backup_config.get('low_priority', False))
+        self.use_watcher = bool(backup_config.get('use_watcher', True))
+        self.progress_rate = float(backup_config.get('progress_events_per_second', DEFAULT_PROGRESS_RATE))
+        self.progress_debug = bool(backup_config.get('progress_debug', False))
+        # 'async': cada observador recebe os eventos pela própria fila e thread
+        self.set_dispatch_mode(
+            backup_config.get('observer_dispatch', 'sync'),
+            int(backup_config.get('observer_queue_size', DEFAULT_DISPATCH_QUEUE_SIZE))
+        )
+        self.scan_filter = ScanFilter.from_config(backup_config)
+        self.journal_header = {
+            'ticket_number': backup_config.get('ticket_number'),
+            'source_path': os.path.abspath(backup_config.get('source_path') or ''),
+            'destination_path': os.path.abspath(backup_config.get('destination_path') or ''),
+            'destination_format': self.destination_format
+        }
+        self.chunk_store = None
+        if self.destination_format == 'chunked':
+            self.chunk_store = ChunkStore(backup_config.get('destination_path'), self._throttle)
+        self.pack_writer = None
+        if self.destination_format == 'packed':
+            self.pack_writer = PackWriter(backup_config.get('destination_path'), throttle=self._throttle)
+            self.pack_threshold = int(backup_config.get('pack_threshold_kb', DEFAULT_PACK_THRESHOLD_KB) * 1024)
+        self.snapshot_path = None
+        self.previous_snapshot = None
+        if self.destination_format == 'snapshot':
+            dest_path = backup_config.get('destination_path')
+            self.previous_snapshot = self._latest_snapshot(dest_path, self.journal_header['source_path'])
+            self.snapshot_path = os.path.join(dest_path, datetime.now().strftime(SNAPSHOT_NAME_FORMAT))
+
+    def _latest_snapshot(self, dest_path: str, source_path: str, until: datetime = None):
+        """Último snapshot completo (com manifesto gravado) de `source_path` em
+        dest_path, opcionalmente criado até `until`"""
+        try:
+            names = sorted(name for name in os.listdir(dest_path) if _SNAPSHOT_NAME_RE.match(name))
+        except OSError:
+            return None
+        for name in reversed(names):
+            if until is not None and datetime.strptime(name[:17], _SNAPSHOT_SECONDS_FORMAT) > until:
+                continue
+            snapshot = os.path.join(dest_path, name)
+            if self._load_manifest(os.path.join(snapshot, MANIFEST_FILENAME), source_path):
+                return snapshot
+        return None
+
+    def _target_path(self, dest_path: str) -> str:
+        """Pasta onde os arquivos desta execução são gravados"""
+        return self.snapshot_path or dest_path
+
+    def _manifest_file(self, dest_path: str, source_path: str = None) -> str:
+        """No repositório deduplicado, compartilhado entre estações, cada origem
+        tem o seu manifesto; nos demais formatos o destino é de uma origem só"""
+        if self.destination_format == 'chunked':
+            key = source_key(source_path or self.journal_header.get('source_path'))
+            return os.path.join(dest_path, f'.bluemacaw_manifest.{key}.json')
+        return os.path.join(dest_path, MANIFEST_FILENAME)
+
+    @staticmethod
+    def _load_manifest(manifest_file: str, source_path: str) -> Dict:
+        """Manifesto gravado por um backup de `source_path` (vazio se não existe
+        ou se foi gravado por outra origem)"""
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if source_key(manifest.get('source_path')) != source_key(source_path):
+            return {}
+        return manifest
+
+    def _read_manifest_file(self, dest_path: str) -> Dict:
+        return self._load_manifest(self._manifest_file(dest_path), self.journal_header.get('source_path'))
+
+    def _load_dest_manifest(self, dest_path: str) -> Dict:
+        """Carrega o manifesto gravado no destino pela execução anterior"""
+        manifest = self._read_manifest_file(dest_path)
+        if not manifest:
+            return {}
+        # Hashes e compressão só valem para os arquivos que não mudaram desde então
+        self.previous_digests = manifest.get('digests', {})
+        self.previous_compressed = manifest.get('compressed', {})
+        return manifest.get('files', {})
+
+    def _save_dest_manifest(self, dest_path: str, entries: List[ManifestEntry]) -> None:
+        """Grava (de forma atômica) o manifesto desta execução no destino"""
+        manifest_file = self._manifest_file(dest_path)
+        tmp_file = manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'source_path': self.journal_header.get('source_path'),
+                'files': {entry.rel_path: [entry.size, entry.mtime] for entry in entries},
+                'digests': {
+                    entry.rel_path: self.file_digests[entry.rel_path]
+                    for entry in entries if entry.rel_path in self.file_digests
+                },
+                'compressed': {
+                    entry.rel_path: self.compressed_files[entry.rel_path]
+                    for entry in entries if entry.rel_path in self.compressed_files
+                },
+                'deleted': self.deleted_files,
+                # Alterações posteriores a este ponto ficam com o watcher
+                'scanned_at': self.scan_started,
+                'filters': self._filter_fingerprint()
+            }, f)
+        os.replace(tmp_file, manifest_file)
+
+    def _plan_copy(self, dest_path: str) -> List[ManifestEntry]:
+        """Define quais entradas do manifesto precisam ser copiadas"""
+        self.deleted_files = []
+        self.recipe_files = {}
+        self.link_sources = {}
+        self.pack_index = {}
+        self.file_digests = {}
+        self.previous_digests = {}
+        self.compressed_files = {}
+        self.previous_compressed = {}
+        self.manifest_paths = {entry.rel_path for entry in self.manifest}
+        self.previous_codecs = {}
+        if self.snapshot_path is None and self.chunk_store is None:
+            previous_manifest = self._read_manifest_file(dest_path)
+            previous_compressed = previous_manifest.get('compressed', {})
+            self.previous_codecs = {
+                rel_path: previous_compressed[rel_path]['codec'] if rel_path in previous_compressed else None
+                for rel_path in previous_manifest.get('files', {})
+            }
+        if self.snapshot_path is not None:
+            return self._plan_snapshot()
+        if self.backup_type != 'incremental':
+            return list(self.manifest)
+        
+        previous = self._load_dest_manifest(dest_path)
+        to_copy = []
+        previous_recipe = self._load_previous_recipe()
+        previous_index = PackReader.load_index(dest_path) if self.pack_writer is not None else {}
+        for entry in self.manifest:
+            if previous.get(entry.rel_path) != [entry.size, entry.mtime]:
+                to_copy.append(entry)
+                continue
+            self._keep_previous_state(entry.rel_path)
+            if self.chunk_store is not None:
+                # Inalterado: a nova receita reaproveita os chunks da anterior
+                if entry.rel_path in previous_recipe:
+                    self.recipe_files[entry.rel_path] = previous_recipe[entry.rel_path]
+                else:
+                    to_copy.append(entry)
+            elif self.pack_writer is not None:
+                # Inalterado: o novo índice aponta para o pack da execução anterior
+                if entry.rel_path in previous_index:
+                    self.pack_index[entry.rel_path] = previous_index[entry.rel_path]
+                elif entry.size < self.pack_threshold:
+                    to_copy.append(entry)
+        
+        # Arquivos que existiam na execução anterior e sumiram da origem
+        current = {entry.rel_path for entry in self.manifest}
+        self.deleted_files = sorted(path for path in previous if path not in current)
+        if self.deleted_files:
+            self.log_manager.log_info(
+                f"Backup incremental: {len(self.deleted_files)} arquivo(s) removido(s) da origem"
+            )
+        return to_copy
+
+    def _plan_backup(self, source_path: str, dest_path: str) -> Dict:
+        """Planejamento antes da cópia: espaço necessário no destino e duração prevista"""
+        target_path = self._target_path(dest_path)
+        self.copy_plan = self._plan_copy(target_path)
+        
+        to_write = [entry for entry in self.copy_plan if entry.rel_path not in self.link_sources]
+        # Arquivos esparsos ocupam no destino apenas as extensões de dados
+        bytes_to_copy = sum(entry.data_size for entry in to_write)
+        # Na árvore comum os arquivos sobrescritos liberam o espaço da versão anterior
+        reclaimed = 0
+        if self.destination_format == 'tree':
+            previous = self._read_manifest_file(target_path)
+            previous_files = previous.get('files', {})
+            previous_compressed = previous.get('compressed', {})
+            for entry in to_write:
+                if entry.rel_path in previous_files and entry.rel_path not in previous_compressed:
+                    reclaimed += previous_files[entry.rel_path][0]
+        required = max(0, bytes_to_copy - reclaimed)
+        required += int(required * SPACE_OVERHEAD_RATIO) + SPACE_OVERHEAD_BYTES
+        
+        # O destino já existe (criado na verificação de conectividade)
+        free = shutil.disk_usage(dest_path).free
+        throughput = self.log_manager.get_average_throughput(source_path, dest_path)
+        plan = {
+            "files_to_copy": len(to_write),
+            "bytes_to_copy": bytes_to_copy,
+            "required_space": required,
+            "free_space": free,
+            "throughput": throughput,
+            "estimated_duration": bytes_to_copy / throughput if throughput else None
+        }
+        self._notify_observers("backup_planned", plan)
+        
+        if required > free:
+            self.copy_plan = None
+            raise ValueError(
+                f"Sem espaço suficiente no destino: necessário {required / (1024 ** 3):.2f} GB, "
+                f"livre {free / (1024 ** 3):.2f} GB"
+            )
+        return plan
+
+    def _keep_previous_state(self, rel_path: str) -> None:
+        """Arquivo inalterado: mantém o hash e a compressão registrados antes"""
+        if rel_path in self.previous_digests:
+            self.file_digests[rel_path] = self.previous_digests[rel_path]
+        if rel_path in self.previous_compressed:
+            self.compressed_files[rel_path] = self.previous_compressed[rel_path]
+
+    def compression_ratio(self):
+        """Razão tamanho gravado / original dos arquivos comprimidos nesta execução"""
+        if not self.compression_stats['original']:
+            return None
+        return self.compression_stats['stored'] / self.compression_stats['original']
+
+    def _plan_snapshot(self) -> List[ManifestEntry]:
+        """No modo snapshot, arquivos inalterados viram hardlinks do snapshot anterior"""
+        if self.previous_snapshot is None:
+            return list(self.manifest)
+        
+        previous = self._load_dest_manifest(self.previous_snapshot)
+        for entry in self.manifest:
+            if previous.get(entry.rel_path) == [entry.size, entry.mtime]:
+                self.link_sources[entry.rel_path] = os.path.join(self.previous_snapshot, entry.rel_path)
+        
+        current = {entry.rel_path for entry in self.manifest}
+        self.deleted_files = sorted(path for path in previous if path not in current)
+        # Todos os arquivos aparecem no snapshot, copiados ou com hardlink
+        return list(self.manifest)
+
+    def _load_previous_recipe(self) -> Dict[str, Dict]:
+        """Arquivos da receita mais recente do repositório deduplicado"""
+        if self.chunk_store is None:
+            return {}
+        recipe_file = self.chunk_store.latest_recipe(self.journal_header.get('source_path'))
+        if recipe_file is None:
+            return {}
+        try:
+            return self.chunk_store.load_recipe(recipe_file).get('files', {})
+        except (OSError, ValueError):
+            return {}
+
     def _copy_files(self, source_path: str, dest_path: str, total_files) -> None:
         self._notify_observers("copying_files", {})
+        copy_started = time.monotonic()
         files_copied = 0
+        files_linked = 0
+        bytes_copied = 0
+        self.delta_files = 0
+        self.delta_bytes_written = 0
+        self.compression_stats = {'original': 0, 'stored': 0, 'seconds': 0.0}
         
-        for root, _, files in os.walk(source_path):
-            for file in files:
-                source_file = os.path.join(root, file)
-                rel_path = os.path.relpath(source_file, source_path)
-                dest_file = os.path.join(dest_path, rel_path)
+        dest_path = self._target_path(dest_path)
+        if self.snapshot_path is not None:
+            # Cada execução grava num snapshot novo; nunca na pasta de outra
+            try:
+                os.mkdir(dest_path)
+            except FileExistsError:
+                raise ValueError(f"Snapshot já existe: {dest_path}")
+        else:
+            os.makedirs(dest_path, exist_ok=True)
+        to_copy = self.copy_plan if self.copy_plan is not None else self._plan_copy(dest_path)
+        self.copy_plan = None
+        self.files_skipped = len(self.manifest) - len(to_copy)
+        # No incremental o progresso considera apenas o que precisa ser copiado
+        total_files = len(to_copy)
+        failed = set()
+        progress = ProgressReporter(
+            self._notify_observers, total_files, sum(entry.size for entry in to_copy),
+            self.progress_rate, self.progress_debug
+        )
+        
+        # Journal dos arquivos concluídos; snapshots usam uma pasta nova por execução
+        journal = None
+        resumable = {}
+        self.files_resumed = 0
+        if self.snapshot_path is None:
+            journal = CopyJournal(
+                dest_path, self.journal_header,
+                self.pack_writer.flush if self.pack_writer is not None else None
+            )
+            resumable = self._resumable_records(journal, dest_path)
+            journal.start(resume=bool(resumable))
+        
+        def record(entry, source_file, error, result, resumed=False):
+            nonlocal files_copied, files_linked, bytes_copied
+            if isinstance(error, BackupCancelled):
+                raise error
+            if error is not None:
+                failed.add(entry.rel_path)
+                self._notify_observers("error", {
+                    "error_type": "inaccessible_file",
+                    "message": f"Erro ao copiar {source_file}: {str(error)}"
+                })
+                return
+            
+            if self._record_result(entry, result):
+                files_linked += 1
+            else:
+                files_copied += 1
+                if not resumed:
+                    bytes_copied += entry.size
+            if journal is not None and not resumed:
+                journal.append(entry.rel_path, entry.size, entry.mtime, result)
+            progress.advance(entry.rel_path, entry.size, files_copied + files_linked)
+        
+        try:
+            # Usa o manifesto da contagem em vez de percorrer a origem novamente
+            entries = []
+            for entry in to_copy:
+                # Já concluído numa execução interrompida com a mesma origem/destino
+                previous = resumable.get(entry.rel_path)
+                if previous is not None and previous['s'] == entry.size and previous['m'] == entry.mtime:
+                    self.files_resumed += 1
+                    record(entry, os.path.join(source_path, entry.rel_path), None, previous['r'], resumed=True)
+                    continue
+                entries.append(entry)
+            
+            if self.copy_engine == 'async':
+                AsyncCopyPipeline(self, DIGEST_SIZE).run(entries, source_path, dest_path, record)
+            else:
+                self._run_copy_pool(entries, source_path, dest_path, record)
+            progress.finish()
+        finally:
+            # Contagem parcial fica disponível mesmo se a cópia for interrompida
+            self.files_copied = files_copied
+            self.bytes_copied = bytes_copied
+            self.copy_duration = time.monotonic() - copy_started
+            if journal is not None:
+                journal.close()
+        
+        # Arquivos com hardlink não foram copiados: contam como inalterados
+        self.files_skipped += files_linked
+        if self.files_resumed:
+            self.log_manager.log_info(
+                f"Backup retomado: {self.files_resumed} arquivo(s) já copiados na execução anterior"
+            )
+        if self.snapshot_path is not None:
+            self.log_manager.log_info(
+                f"Snapshot {self.snapshot_path}: {files_copied} copiado(s), {files_linked} hardlink(s)"
+            )
+        for name, metrics in self.dispatch_metrics().items():
+            self.log_manager.log_info(
+                f"Observador {name}: atraso máximo da fila {metrics['max_lag'] * 1000:.0f} ms, "
+                f"{metrics['dropped']} evento(s) de progresso descartado(s)"
+            )
+        if self.delta_files:
+            self.log_manager.log_info(
+                f"Transferência delta: {self.delta_files} arquivo(s), "
+                f"{self.delta_bytes_written / (1024 * 1024):.2f} MB regravados"
+            )
+        if self.compression_stats['original']:
+            self.log_manager.log_info(
+                f"Compressão ({self.compression}): "
+                f"{self.compression_stats['original'] / (1024 * 1024):.2f} MB -> "
+                f"{self.compression_stats['stored'] / (1024 * 1024):.2f} MB "
+                f"em {self.compression_stats['seconds']:.1f}s"
+            )
+        if self.pack_writer is not None:
+            self.pack_writer.close()
+            index_file = self.pack_writer.write_index(self.pack_index)
+            self.log_manager.log_info(
+                f"{len(self.pack_index)} arquivo(s) empacotado(s), índice gravado em {index_file}"
+            )
+        if self.chunk_store is not None:
+            recipe_file = self.chunk_store.write_recipe(self.recipe_files, source_path)
+            self.log_manager.log_info(f"Receita do backup deduplicado gravada em {recipe_file}")
+        # Arquivos que falharam ficam fora do manifesto e serão copiados na próxima vez
+        self._save_dest_manifest(
+            dest_path, [entry for entry in self.manifest if entry.rel_path not in failed]
+        )
+        if journal is not None:
+            journal.complete()
+        if self.use_watcher:
+            # Este destino está em dia até o início da varredura; os que falharam continuam pendentes
+            try:
+                DirtyPathStore(source_path).advance(
+                    self.journal_header.get('destination_path'), self.scan_started, keep=failed
+                )
+            except Exception as e:
+                self.log_manager.log_warning(f"Não foi possível atualizar os caminhos alterados: {str(e)}")
+    
+    def _run_copy_pool(self, entries: List[ManifestEntry], source_path: str, dest_path: str,
+                       record, task=None) -> None:
+        """Motor padrão: workers em ThreadPoolExecutor, cada um lê e grava um arquivo inteiro.
+        `task` substitui o _copy_task (ex.: restauração)"""
+        task = task or self._copy_task
+        created_dirs = set()
+        # Resultados dos workers voltam por esta fila; só esta thread notifica
+        results = queue.Queue()
+        pending = 0
+        in_flight_bytes = 0
+        max_pending = self.copy_workers * 4
+        
+        def handle_result():
+            nonlocal pending, in_flight_bytes
+            entry, source_file, cost, error, result = results.get().result()
+            pending -= 1
+            in_flight_bytes -= cost
+            record(entry, source_file, error, result)
+        
+        with ThreadPoolExecutor(max_workers=self.copy_workers, initializer=self._init_worker) as pool:
+            for entry in entries:
+                self.control.checkpoint()
+                source_file = os.path.join(source_path, entry.rel_path)
+                dest_file = os.path.join(dest_path, entry.rel_path)
+                self._prepare_dest_dir(entry, dest_file, created_dirs)
                 
-                # Criar diretório de destino se não existir
-                os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+                # Um arquivo maior que o orçamento ocupa o orçamento inteiro
+                cost = min(entry.size, self.max_in_flight_bytes)
+                while pending and (pending >= max_pending
+                                   or in_flight_bytes + cost > self.max_in_flight_bytes):
+                    handle_result()
                 
-                # Copiar arquivo
+                future = pool.submit(task, entry, source_file, dest_file, cost)
+                future.add_done_callback(results.put)
+                pending += 1
+                in_flight_bytes += cost
+            
+            while pending:
+                handle_result()
+
+    def _prepare_dest_dir(self, entry: ManifestEntry, dest_file: str, created_dirs: set) -> None:
+        """Cria o diretório de destino se não existir (só para arquivos em árvore)"""
+        dest_dir = os.path.dirname(dest_file)
+        if self._writes_tree(entry) and dest_dir not in created_dirs:
+            os.makedirs(dest_dir, exist_ok=True)
+            created_dirs.add(dest_dir)
+
+    def _record_result(self, entry: ManifestEntry, result) -> bool:
+        """Registra o resultado de um arquivo concluído. Retorna True se foi hardlink"""
+        if result is None:
+            return False
+        if 'chunks' in result:
+            self.recipe_files[entry.rel_path] = result
+        if 'pack' in result:
+            self.pack_index[entry.rel_path] = result
+        if 'delta_written' in result:
+            self.delta_files += 1
+            self.delta_bytes_written += result['delta_written']
+        if result.get('digest'):
+            self.file_digests[entry.rel_path] = result['digest']
+        if 'compressed' in result:
+            self.compressed_files[entry.rel_path] = result['compressed']
+            self.compression_stats['original'] += entry.size
+            self.compression_stats['stored'] += result['compressed']['size']
+            self.compression_stats['seconds'] += result['compress_time']
+        if result.get('linked'):
+            self._keep_previous_state(entry.rel_path)
+            return True
+        return False
+
+    def _resumable_records(self, journal: CopyJournal, dest_path: str) -> Dict[str, Dict]:
+        """Carrega o journal de uma execução interrompida, conferindo o último arquivo"""
+        records = journal.load()
+        if not records:
+            return {}
+        
+        # Só o último arquivo registrado pode ter ficado incompleto no destino
+        last = records[journal.last_path]
+        if not self._verify_resumed(last, dest_path):
+            del records[journal.last_path]
+        self.log_manager.log_info(f"Journal de execução interrompida encontrado: {len(records)} arquivo(s)")
+        return records
+
+    def _verify_resumed(self, record: Dict, dest_path: str) -> bool:
+        """Confere no destino o arquivo registrado por último no journal"""
+        result = record['r'] or {}
+        try:
+            if 'chunks' in result:
+                return self.chunk_store.verify_file(result, set()) is None
+            if 'pack' in result:
+                pack_file = os.path.join(self.pack_writer.packs_path, result['pack'])
+                return os.path.getsize(pack_file) >= result['offset'] + result['length']
+            
+            dest_file = os.path.join(dest_path, record['p'])
+            compressed = result.get('compressed')
+            if compressed is not None:
+                dest_file += codec_suffix(compressed['codec'])
+                if os.path.getsize(dest_file) != compressed['size']:
+                    return False
+            elif os.path.getsize(dest_file) != record['s']:
+                return False
+            if self.validation == 'digest' and result.get('digest'):
+                codec = compressed['codec'] if compressed is not None else None
+                return self._file_digest(dest_file, codec) == result['digest']
+            return True
+        except (OSError, EOFError, zlib.error, lzma.LZMAError):
+            return False
+    
+    def _init_worker(self) -> None:
+        """Inicialização de cada thread de cópia"""
+        if self.low_priority and not lower_thread_priority():
+            self.log_manager.log_warning("Não foi possível reduzir a prioridade da cópia")
+
+    def _copy_task(self, entry: ManifestEntry, source_file: str, dest_file: str, cost: int) -> tuple:
+        """Executado nos workers: copia um arquivo e devolve o resultado"""
+        try:
+            self.control.checkpoint()
+            return entry, source_file, cost, None, self._transfer_file(entry, source_file, dest_file)
+        except Exception as e:
+            return entry, source_file, cost, e, None
+
+    def _writes_tree(self, entry: ManifestEntry) -> bool:
+        """Indica se o arquivo é gravado como arquivo comum na pasta de destino"""
+        if self.chunk_store is not None:
+            return False
+        return self.pack_writer is None or entry.size >= self.pack_threshold
+
+    def _transfer_file(self, entry: ManifestEntry, source_file: str, dest_file: str):
+        """Grava um arquivo no formato de destino escolhido"""
+        if not self._writes_tree(entry) and self.pack_writer is not None:
+            return self.pack_writer.add_file(source_file, DIGEST_SIZE)
+        if self.chunk_store is not None:
+            stored = self.chunk_store.store_file(source_file)
+            return {
+                'size': entry.size,
+                'mtime': entry.mtime,
+                'digest': stored['digest'],
+                'chunks': stored['chunks']
+            }
+        link_source = self.link_sources.get(entry.rel_path)
+        if link_source is not None:
+            # No snapshot anterior o arquivo pode ter sido gravado comprimido
+            previous_compressed = self.previous_compressed.get(entry.rel_path)
+            suffix = codec_suffix(previous_compressed['codec']) if previous_compressed else ''
+            try:
+                os.link(link_source + suffix, dest_file + suffix)
+                return {'linked': True}
+            except OSError:
+                # Sistema de arquivos sem hardlink (ou snapshot anterior alterado): copia
+                pass
+        # Não comprime se o nome comprimido é o de outro arquivo da origem
+        if self.compression is not None and \
+                entry.rel_path + codec_suffix(self.compression) not in self.manifest_paths and \
+                is_compressible(source_file, entry.size):
+            result = self._compress_copy(source_file, dest_file)
+        elif entry.is_sparse and hasattr(os, 'SEEK_DATA'):
+            result = {'digest': self._sparse_copy(source_file, dest_file, entry.size)}
+        elif self._use_delta(entry, dest_file):
+            digest, written = self._delta_copy(source_file, dest_file)
+            result = {'digest': digest, 'delta_written': written}
+        else:
+            result = {'digest': self._copy_file(source_file, dest_file)}
+        self._remove_stale_copy(entry.rel_path, dest_file, result.get('compressed', {}).get('codec'))
+        return result
+
+    def _remove_stale_copy(self, rel_path: str, dest_file: str, codec: Optional[str]) -> None:
+        """A compressão do arquivo mudou desde o backup anterior: remove a versão
+        gravada antes (comum ou com outro codec), que não seria mais atualizada"""
+        if rel_path not in self.previous_codecs:
+            return
+        previous_codec = self.previous_codecs[rel_path]
+        if previous_codec == codec:
+            return
+        stale_file = dest_file
+        if previous_codec is not None:
+            # O nome antigo pode ser, agora, o de outro arquivo da origem
+            if rel_path + codec_suffix(previous_codec) in self.manifest_paths:
+                return
+            stale_file += codec_suffix(previous_codec)
+        try:
+            os.remove(stale_file)
+        except FileNotFoundError:
+            pass
+
+    def _compress_copy(self, source_file: str, dest_file: str) -> Dict:
+        """Grava o arquivo comprimido em fluxo (dest_file + sufixo do codec).
+
+        zlib, lzma e bz2 liberam o GIL ao comprimir, então os workers da cópia
+        comprimem em paralelo sem um pool separado."""
+        compressor = new_compressor(self.compression, self.compression_level)
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE) if self.validation == 'digest' else None
+        buffer = self._get_copy_buffer()
+        compress_time = 0.0
+        
+        with open(source_file, 'rb', buffering=0) as src, \
+                open(dest_file + codec_suffix(self.compression), 'wb') as dst:
+            while True:
+                read = src.readinto(buffer)
+                if not read:
+                    break
+                chunk = buffer[:read]
+                if digest is not None:
+                    digest.update(chunk)
+                started = time.perf_counter()
+                data = compressor.compress(chunk)
+                compress_time += time.perf_counter() - started
+                dst.write(data)
+                self._throttle(len(data))
+            started = time.perf_counter()
+            data = compressor.flush()
+            compress_time += time.perf_counter() - started
+            dst.write(data)
+            self._throttle(len(data))
+            stored_size = dst.tell()
+        
+        return {
+            'digest': digest.hexdigest() if digest is not None else None,
+            'compressed': {'codec': self.compression, 'size': stored_size},
+            'compress_time': compress_time
+        }
+
+    def _sparse_copy(self, source_file: str, dest_file: str, size: int):
+        """Copia só as extensões de dados (SEEK_DATA/SEEK_HOLE) e recria os buracos.
+        O hash considera os buracos como zeros, igual ao conteúdo lógico"""
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE) if self.validation == 'digest' else None
+        buffer = self._get_copy_buffer()
+        
+        with open(source_file, 'rb', buffering=0) as src, open(dest_file, 'wb', buffering=0) as dst:
+            fd = src.fileno()
+            offset = 0
+            while offset < size:
                 try:
-                    with open(source_file, 'rb') as src, open(dest_file, 'wb') as dst:
-                        dst.write(src.read())
-                except Exception as e:
-                    self._notify_observers("error", {
-                        "error_type": "inaccessible_file",
-                        "message": f"Erro ao copiar {source_file}: {str(e)}"
-                    })
-                    continue
+                    data_start = min(os.lseek(fd, offset, os.SEEK_DATA), size)
+                except OSError as e:
+                    # ENXIO: não há mais dados até o fim do arquivo
+                    if e.errno != errno.ENXIO:
+                        raise
+                    data_start = size
+                data_end = min(os.lseek(fd, data_start, os.SEEK_HOLE), size) if data_start < size else size
                 
-                files_copied += 1
-                progress = int((files_copied / total_files) * 100)
+                if digest is not None:
+                    hole = data_start - offset
+                    while hole > 0:
+                        step = min(hole, len(_ZERO_BLOCK))
+                        digest.update(_ZERO_BLOCK[:step])
+                        hole -= step
+                
+                src.seek(data_start)
+                dst.seek(data_start)
+                remaining = data_end - data_start
+                while remaining > 0:
+                    read = src.readinto(buffer[:min(len(buffer), remaining)])
+                    if not read:
+                        break
+                    chunk = buffer[:read]
+                    if digest is not None:
+                        digest.update(chunk)
+                    while chunk:
+                        chunk = chunk[dst.write(chunk):]
+                    self._throttle(read)
+                    remaining -= read
+                offset = data_end
+            
+            # Buraco final: o tamanho lógico é definido sem gravar zeros
+            dst.truncate(size)
+        
+        return digest.hexdigest() if digest is not None else None
+
+    def _use_delta(self, entry: ManifestEntry, dest_file: str) -> bool:
+        """Arquivo grande que já existe no destino: vale regravar só o que mudou"""
+        if self.delta_threshold is None or entry.size < self.delta_threshold:
+            return False
+        try:
+            stat = os.stat(dest_file)
+        except OSError:
+            return False
+        # Com hardlink a alteração in-place apareceria também no outro caminho
+        return stat.st_nlink == 1 and stat.st_size > 0
+
+    def _delta_copy(self, source_file: str, dest_file: str) -> tuple:
+        """Atualiza dest_file in-place gravando apenas os blocos diferentes da origem.
+        Retorna (hash do conteúdo, bytes gravados)"""
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE) if self.validation == 'digest' else None
+        src_buffer = self._get_copy_buffer()
+        dst_buffer = getattr(self._thread_local, 'delta_buffer', None)
+        if dst_buffer is None or len(dst_buffer) != len(src_buffer):
+            dst_buffer = self._thread_local.delta_buffer = memoryview(bytearray(len(src_buffer)))
+        written = 0
+        offset = 0
+        
+        with open(source_file, 'rb', buffering=0) as src, open(dest_file, 'r+b', buffering=0) as dst:
+            while True:
+                # Blocos iguais não passam pelo _throttle
+                self.control.checkpoint()
+                read = src.readinto(src_buffer)
+                if not read:
+                    break
+                if digest is not None:
+                    digest.update(src_buffer[:read])
+                dst.seek(offset)
+                dst_read = dst.readinto(dst_buffer[:read])
                 
-                self._notify_observers("progress_update", {
-                    "progress": progress,
-                    "files_copied": files_copied,
-                    "total_files": total_files
-                })       
+                # Comparação bloco a bloco no mesmo offset (os dois lados são legíveis
+                # aqui, então a comparação direta substitui os checksums do rsync)
+                if dst_read != read or src_buffer[:read] != dst_buffer[:read]:
+                    for start in range(0, read, DELTA_BLOCK_SIZE):
+                        end = min(start + DELTA_BLOCK_SIZE, read)
+                        if end <= dst_read and src_buffer[start:end] == dst_buffer[start:end]:
+                            continue
+                        dst.seek(offset + start)
+                        block = src_buffer[start:end]
+                        while block:
+                            block = block[dst.write(block):]
+                        self._throttle(end - start)
+                        written += end - start
+                offset += read
+            
+            # Arquivo encolheu: descarta o excedente do destino
+            dst.truncate(offset)
+        
+        return (digest.hexdigest() if digest is not None else None), written
     
+    def _copy_file(self, source_file: str, dest_file: str):
+        """Copia um arquivo em blocos, sem carregá-lo inteiro na memória.
+        Retorna o hash do conteúdo quando a validação é por digest"""
+        # buffering=0: lemos direto no nosso buffer, sem cópia intermediária
+        with open(source_file, 'rb', buffering=0) as src, open(dest_file, 'wb', buffering=0) as dst:
+            if self.validation == 'digest':
+                # O hash é calculado sobre o mesmo buffer da cópia: sem leitura extra
+                digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+                self._buffered_copy(src, dst, digest)
+                return digest.hexdigest()
+            if self._zero_copy_enabled and self._kernel_copy(src.fileno(), dst.fileno()):
+                return None
+            # Fallback (ou continuação após falha parcial do kernel): os offsets
+            # dos dois arquivos já estão no ponto em que a cópia parou
+            self._buffered_copy(src, dst)
+            return None
+
+    def _kernel_copy(self, src_fd: int, dst_fd: int) -> bool:
+        """Copia via copy_file_range/sendfile (Linux). Retorna False se não suportado"""
+        for name in ('copy_file_range', 'sendfile'):
+            kernel_copy = getattr(os, name, None)
+            if kernel_copy is None:
+                continue
+            try:
+                while True:
+                    if name == 'sendfile':
+                        copied = kernel_copy(dst_fd, src_fd, None, self.copy_buffer_size * 8)
+                    else:
+                        copied = kernel_copy(src_fd, dst_fd, self.copy_buffer_size * 8)
+                    if copied == 0:
+                        return True
+                    self._throttle(copied)
+            except OSError as e:
+                if e.errno not in _ZERO_COPY_UNSUPPORTED:
+                    raise
+                if e.errno == errno.ENOSYS:
+                    # Kernel sem suporte: não tenta mais nesta execução
+                    self._zero_copy_enabled = False
+        return False
+
+    def _throttle(self, nbytes: int) -> None:
+        """Chamado a cada bloco gravado: pausa/cancelamento e limite de banda"""
+        self.control.checkpoint()
+        self.rate_limiter.consume(nbytes)
+
+    def _get_copy_buffer(self) -> memoryview:
+        """Buffer de cópia da thread atual, alocado uma única vez por tamanho"""
+        buffer = getattr(self._thread_local, 'copy_buffer', None)
+        if buffer is None or len(buffer) != self.copy_buffer_size:
+            buffer = self._thread_local.copy_buffer = memoryview(bytearray(self.copy_buffer_size))
+        return buffer
+
+    def _buffered_copy(self, src, dst, digest=None) -> None:
+        """Cópia com readinto em buffer reutilizável de tamanho fixo"""
+        buffer = self._get_copy_buffer()
+        while True:
+            read = src.readinto(buffer)
+            if not read:
+                break
+            chunk = buffer[:read]
+            if digest is not None:
+                digest.update(chunk)
+            # Escrita sem buffer pode ser parcial
+            while chunk:
+                written = dst.write(chunk)
+                chunk = chunk[written:]
+            self._throttle(read)
+
     def _validate_backup(self, source_path: str, dest_path: str):
         """Valida se todos os arquivos foram copiados corretamente"""
         self._notify_observers("validating", {})
         
         errors = []
+        to_hash = []
+        dest_path = self._target_path(dest_path)
         
-        # Percorre todos os arquivos na origem
-        for root, _, files in os.walk(source_path):
-            for file in files:
-                source_file = os.path.join(root, file)
-                # Calcula o caminho relativo e reconstrói no destino
-                rel_path = os.path.relpath(source_file, source_path)
-                dest_file = os.path.join(dest_path, rel_path)
-                
-                # Verifica se o arquivo existe no destino
-                if not os.path.exists(dest_file):
-                    errors.append(f"Arquivo não encontrado no destino: {rel_path}")
-                    continue
-                
-                # Verifica o tamanho dos arquivos
-                try:
-                    source_size = os.path.getsize(source_file)
-                    dest_size = os.path.getsize(dest_file)
-                    
-                    if source_size != dest_size:
-                        errors.append(f"Tamanho diferente para o arquivo: {rel_path}")
-                except OSError as e:
-                    errors.append(f"Erro ao verificar arquivo {rel_path}: {str(e)}")
+        if self.chunk_store is not None:
+            errors = self._validate_recipe()
+        if self.pack_writer is not None:
+            errors = self._validate_packs(dest_path)
+        
+        # Confere o destino contra o manifesto da origem (tamanho já conhecido)
+        for entry in self.manifest:
+            self.control.checkpoint()
+            if self.chunk_store is not None or entry.rel_path in self.pack_index:
+                continue
+            dest_file = os.path.join(dest_path, entry.rel_path)
+            # Arquivo gravado comprimido: confere o tamanho gravado e o conteúdo descomprimido
+            compressed = self.compressed_files.get(entry.rel_path)
+            expected_size = entry.size
+            if compressed is not None:
+                dest_file += codec_suffix(compressed['codec'])
+                expected_size = compressed['size']
+            
+            # Um único stat verifica existência e tamanho no destino
+            try:
+                dest_size = os.stat(dest_file).st_size
+            except FileNotFoundError:
+                errors.append(f"Arquivo não encontrado no destino: {entry.rel_path}")
+                continue
+            except OSError as e:
+                errors.append(f"Erro ao verificar arquivo {entry.rel_path}: {str(e)}")
+                continue
+            
+            if expected_size != dest_size:
+                errors.append(f"Tamanho diferente para o arquivo: {entry.rel_path}")
+                continue
+            
+            # Conteúdo: o hash do destino é comparado ao hash calculado na cópia
+            expected = self.file_digests.get(entry.rel_path)
+            if self.validation == 'digest' and expected is not None:
+                codec = compressed['codec'] if compressed is not None else None
+                to_hash.append((dest_size, (entry.rel_path, dest_file, codec)))
+        
+        # Hashes distribuídos entre vários núcleos, em lotes balanceados por bytes
+        if to_hash:
+            digests = compute_digests(
+                to_hash, DIGEST_SIZE, self.validation_workers, self.validation_pool, self.control
+            )
+            for _, (rel_path, _, _) in to_hash:
+                digest, error = digests[rel_path]
+                if error is not None:
+                    errors.append(f"Erro ao verificar arquivo {rel_path}: {error}")
+                elif digest != self.file_digests[rel_path]:
+                    errors.append(f"Conteúdo diferente para o arquivo: {rel_path}")
         
         if errors:
+            # Mensagem para a interface limitada às primeiras ocorrências
+            shown = ', '.join(errors[:MAX_REPORTED_ERRORS])
+            if len(errors) > MAX_REPORTED_ERRORS:
+                shown += f" (e mais {len(errors) - MAX_REPORTED_ERRORS})"
             self._notify_observers("error", {
                 "error_type": "validation_failed",
-                "message": f"Erros na validação: {', '.join(validation_errors)}"
+                "message": f"Erros na validação: {shown}"
             })
             
             raise Exception("Backup validation failed with errors: " + ", ".join(errors))
-    
\ No newline at end of file
+
+    def _file_digest(self, path: str, codec=None) -> str:
+        """Calcula o hash de um arquivo já gravado (via mmap nos arquivos grandes).
+        Com codec, o hash é do conteúdo descomprimido"""
+        return file_digest(path, DIGEST_SIZE, codec)
+
+    def _validate_packs(self, dest_path: str) -> List[str]:
+        """Valida os arquivos empacotados lendo cada um pelo índice gravado"""
+        errors = []
+        reader = PackReader(dest_path)
+        for entry in self.manifest:
+            self.control.checkpoint()
+            if entry.rel_path not in self.pack_index:
+                continue
+            if entry.rel_path not in reader.index:
+                errors.append(f"Arquivo não encontrado no destino: {entry.rel_path}")
+                continue
+            error = reader.verify_file(entry.rel_path, self.validation == 'digest')
+            if error:
+                errors.append(f"Erro ao verificar arquivo {entry.rel_path}: {error}")
+        return errors
+
+    def _validate_recipe(self) -> List[str]:
+        """Valida o backup deduplicado: cada arquivo deve ter todos os seus chunks
+        e, no modo digest, o hash remontado dos chunks deve ser o da receita"""
+        errors = []
+        checked = set()
+        to_hash = []
+        for entry in self.manifest:
+            self.control.checkpoint()
+            file_info = self.recipe_files.get(entry.rel_path)
+            if file_info is None:
+                errors.append(f"Arquivo não encontrado no destino: {entry.rel_path}")
+                continue
+            error = self.chunk_store.verify_file(file_info, checked)
+            if error:
+                errors.append(f"Erro ao verificar arquivo {entry.rel_path}: {error}")
+            elif self.validation == 'digest' and file_info.get('digest'):
+                chunk_files = [self.chunk_store.chunk_path(chunk_hash) for chunk_hash, _ in file_info['chunks']]
+                to_hash.append((file_info['size'], (entry.rel_path, chunk_files, None)))
+        
+        if to_hash:
+            digests = compute_digests(
+                to_hash, DIGEST_SIZE, self.validation_workers, self.validation_pool, self.control
+            )
+            for _, (rel_path, _, _) in to_hash:
+                digest, error = digests[rel_path]
+                if error is not None:
+                    errors.append(f"Erro ao verificar arquivo {rel_path}: {error}")
+                elif digest != self.recipe_files[rel_path]['digest']:
+                    errors.append(f"Conteúdo diferente para o arquivo: {rel_path}")
+        return errors
+
+    def _plan_restore(self, backup_path: str, source_path: str, until: datetime = None,
+                      patterns: List[str] = None) -> List[ManifestEntry]:
+        """Localiza o backup de `source_path` gravado até `until` (árvore, snapshot,
+        packs ou chunks) e seleciona os arquivos a restaurar, todos ou os que
+        casam com `patterns`. Sem backup dessa origem levanta ValueError"""
+        self.file_digests = {}
+        self.compressed_files = {}
+        self.pack_index = {}
+        self.recipe_files = {}
+        root = backup_path
+        store = ChunkStore(backup_path)
+        # Repositório deduplicado: a receita da origem vale como manifesto
+        recipe_file = store.latest_recipe(source_path, until)
+        if recipe_file is not None:
+            self.recipe_files = ChunkStore.load_recipe(recipe_file).get('files', {})
+            files = {rel_path: [info['size'], info['mtime']] for rel_path, info in self.recipe_files.items()}
+        else:
+            snapshot = self._latest_snapshot(backup_path, source_path, until)
+            root = snapshot or backup_path
+            manifest = self._load_manifest(os.path.join(root, MANIFEST_FILENAME), source_path)
+            if not manifest:
+                # Destino compartilhado: nunca restaurar dados de outra origem
+                raise ValueError(f"Nenhum backup de {source_path} encontrado em {backup_path}")
+            files = manifest.get('files', {})
+            self.file_digests = manifest.get('digests', {})
+            self.compressed_files = manifest.get('compressed', {})
+            if snapshot is None:
+                self.pack_index = PackReader.load_index(backup_path)
+        
+        self.restore_source = {
+            'root': root,
+            'packs': PackReader(backup_path) if self.pack_index else None,
+            'chunks': ChunkStoreReader(store, recipe_file) if self.recipe_files else None
+        }
+        # A restauração grava sempre arquivos comuns no destino
+        self.chunk_store = None
+        self.pack_writer = None
+        
+        entries = []
+        for rel_path, (size, mtime) in files.items():
+            if patterns:
+                normalized = rel_path.replace(os.sep, '/')
+                if not any(fnmatch.fnmatch(normalized, pattern) or normalized.startswith(pattern.rstrip('/') + '/')
+                           for pattern in patterns):
+                    continue
+            entries.append(ManifestEntry(rel_path, size, mtime, False))
+        return entries
+
+    def _restore_files(self, backup_path: str, target_path: str, source_path: str,
+                       until: datetime = None, patterns: List[str] = None) -> tuple:
+        """Restaura em target_path os arquivos selecionados do backup de source_path.
+        Retorna (restaurados, falhas)"""
+        entries = self._plan_restore(backup_path, source_path, until, patterns)
+        total_files = len(entries)
+        self._notify_observers("counting_files", {
+            "total_files": total_files,
+            "total_size": sum(entry.size for entry in entries) / (1024 * 1024 * 1024)
+        })
+        self._notify_observers("copying_files", {})
+        os.makedirs(target_path, exist_ok=True)
+        restored = 0
+        failed = []
+        progress = ProgressReporter(
+            self._notify_observers, total_files, sum(entry.size for entry in entries),
+            self.progress_rate, self.progress_debug
+        )
+        
+        def record(entry, source_file, error, result):
+            nonlocal restored
+            if isinstance(error, BackupCancelled):
+                raise error
+            if error is not None:
+                failed.append(entry.rel_path)
+                self._notify_observers("error", {
+                    "error_type": "inaccessible_file",
+                    "message": f"Erro ao restaurar {entry.rel_path}: {str(error)}"
+                })
+                return
+            restored += 1
+            progress.advance(entry.rel_path, entry.size, restored)
+        
+        self._run_copy_pool(entries, self.restore_source['root'], target_path, record, self._restore_task)
+        progress.finish()
+        self.log_manager.log_info(
+            f"Restauração de {backup_path} para {target_path}: {restored} arquivo(s), {len(failed)} falha(s)"
+        )
+        return restored, failed
+
+    def _restore_task(self, entry: ManifestEntry, source_file: str, target_file: str, cost: int) -> tuple:
+        """Executado nos workers: restaura um arquivo e devolve o resultado"""
+        try:
+            self.control.checkpoint()
+            return entry, source_file, cost, None, self._restore_file(entry, source_file, target_file)
+        except Exception as e:
+            return entry, source_file, cost, e, None
+
+    def _restore_file(self, entry: ManifestEntry, source_file: str, target_file: str) -> Dict:
+        """Reconstrói um arquivo a partir do formato em que foi gravado, conferindo
+        o hash registrado no backup"""
+        rel_path = entry.rel_path
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        packs = self.restore_source['packs']
+        chunks = self.restore_source['chunks']
+        compressed = self.compressed_files.get(rel_path)
+        
+        with open(target_file, 'wb', buffering=0) as dst:
+            if chunks is not None and rel_path in self.recipe_files:
+                expected = self.recipe_files[rel_path].get('digest')
+                self._write_blocks(chunks.iter_file(rel_path), dst, digest)
+            elif packs is not None and rel_path in self.pack_index:
+                expected = self.pack_index[rel_path]['digest']
+                self._write_blocks(packs.iter_file(rel_path), dst, digest)
+            elif compressed is not None:
+                expected = self.file_digests.get(rel_path)
+                with open(source_file + codec_suffix(compressed['codec']), 'rb') as src:
+                    self._write_blocks(iter_decompressed(src, compressed['codec']), dst, digest)
+            else:
+                expected = self.file_digests.get(rel_path)
+                with open(source_file, 'rb', buffering=0) as src:
+                    self._buffered_copy(src, dst, digest)
+            size = dst.tell()
+        
+        if size != entry.size:
+            raise ValueError(f"tamanho restaurado ({size}) difere do backup ({entry.size})")
+        if expected and digest.hexdigest() != expected:
+            raise ValueError("conteúdo restaurado difere do hash registrado no backup")
+        if entry.mtime is not None:
+            os.utime(target_file, (entry.mtime, entry.mtime))
+        return {'digest': digest.hexdigest()}
+
+    def _write_blocks(self, blocks, dst, digest) -> None:
+        """Grava no destino os blocos lidos de packs, chunks ou descompressão"""
+        for block in blocks:
+            digest.update(block)
+            view = memoryview(block)
+            while view:
+                view = view[dst.write(view):]
+            self._throttle(len(block))
@@ -26,6 +26,12 @@ class BackupSessionManager:
         # Dados do backup de arquivos
         self.file_backup_files = 0
         self.file_backup_size = 0
+        self.file_backup_copied = 0
+        self.file_backup_skipped = 0
+        self.file_backup_compression_ratio = None
+        self.file_backup_compression_time = None
+        self.file_backup_copied_bytes = None
+        self.file_backup_copy_duration = None
         
         # Dados do backup de software
         self.software_backup_files = 0
@@ -36,10 +42,19 @@ class BackupSessionManager:
         """Define o número do chamado"""
         self.ticket_number = ticket_number
     
-    def set_file_backup_data(self, files, size, source, destination):
+    def set_file_backup_data(self, files, size, source, destination, copied=None, skipped=0,
+                             compression_ratio=None, compression_time=None,
+                             copied_bytes=None, copy_duration=None):
         """Armazena dados do backup de arquivos"""
         self.file_backup_files = files
         self.file_backup_size = size
+        # No backup incremental nem todos os arquivos são copiados
+        self.file_backup_copied = files if copied is None else copied
+        self.file_backup_skipped = skipped
+        self.file_backup_compression_ratio = compression_ratio
+        self.file_backup_compression_time = compression_time
+        self.file_backup_copied_bytes = copied_bytes
+        self.file_backup_copy_duration = copy_duration
         if not self.source_path:
             self.source_path = source
         if not self.destination_path:
@@ -51,6 +66,10 @@ class BackupSessionManager:
         self.software_backup_size = size
         self.software_destination_path = destination
     
+    def get_copied_files(self):
+        """Retorna o total de arquivos efetivamente copiados"""
+        return self.file_backup_copied + self.software_backup_files
+    
     def get_total_files(self):
         """Retorna o total de arquivos copiados"""
         return self.file_backup_files + self.software_backup_files
@@ -72,6 +91,13 @@ class BackupSessionManager:
             'total_size': self.get_total_size(),
             'file_backup_files': self.file_backup_files,
             'file_backup_size': self.file_backup_size,
+            'file_backup_copied': self.file_backup_copied,
+            'file_backup_skipped': self.file_backup_skipped,
+            'compression_ratio': self.file_backup_compression_ratio,
+            'compression_time': self.file_backup_compression_time,
+            'copied_bytes': self.file_backup_copied_bytes,
+            'copy_duration': self.file_backup_copy_duration,
+            'copied_files': self.get_copied_files(),
             'software_backup_files': self.software_backup_files,
             'software_backup_size': self.software_backup_size
         }
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import threading
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Tamanhos dos chunks (bytes): o corte é definido pelo conteúdo entre MIN e MAX
+MIN_CHUNK_SIZE = 16 * 1024
+AVG_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+READ_SIZE = 1024 * 1024
+
+# Corte definido pelo conteúdo: cada byte é reduzido a um símbolo de 2 bits por
+# uma tabela fixa (derivada de hash) e o chunk termina onde aparece a âncora de
+# 8 símbolos, em média 1 a cada 4^8 = 65536 posições. translate/find rodam em C,
+# sem laço em Python por byte
+_SYMBOLS = bytes(hashlib.blake2b(bytes([i]), digest_size=1).digest()[0] & 3 for i in range(256))
+_ANCHOR = bytes([0, 1, 2, 3, 1, 3, 0, 2])
+
+CHUNKS_DIRNAME = 'chunks'
+RECIPES_DIRNAME = 'recipes'
+RECIPE_TIME_FORMAT = '%Y%m%d_%H%M%S_%f'
+
+
+def source_key(source_path: str) -> str:
+    """Identifica a origem nos nomes de receitas e manifestos: o repositório é
+    compartilhado entre estações e cada origem tem a sua sequência de backups"""
+    normalized = os.path.normcase(os.path.abspath(source_path or ''))
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class ChunkStore:
+    """Repositório de chunks deduplicados por hash, compartilhado entre backups"""
+
+    def __init__(self, root: str, throttle=None):
+        self.root = root
+        # Chamado com os bytes gravados (limite de banda do BackupManager)
+        self.throttle = throttle
+        self.chunks_path = os.path.join(root, CHUNKS_DIRNAME)
+        self.recipes_path = os.path.join(root, RECIPES_DIRNAME)
+
+    def chunk_path(self, chunk_hash: str) -> str:
+        """Caminho do arquivo de um chunk (subpasta pelos 2 primeiros caracteres)"""
+        return os.path.join(self.chunks_path, chunk_hash[:2], chunk_hash)
+
+    @staticmethod
+    def _find_boundary(symbols: bytes, start: int, end: int) -> int:
+        """Ponto de corte do chunk que começa em `start` (âncora entre MIN e MAX)"""
+        if end - start <= MIN_CHUNK_SIZE:
+            return end
+        limit = min(end, start + MAX_CHUNK_SIZE)
+        pos = symbols.find(_ANCHOR, start + MIN_CHUNK_SIZE, limit)
+        return pos + len(_ANCHOR) if pos != -1 else limit
+
+    def iter_chunks(self, f) -> Iterator[bytes]:
+        """Divide o conteúdo de um arquivo aberto em chunks definidos pelo conteúdo"""
+        buffer = b''
+        symbols = b''
+        while True:
+            data = f.read(READ_SIZE)
+            if data:
+                buffer += data
+                symbols += data.translate(_SYMBOLS)
+            start = 0
+            # Só corta com o máximo disponível em memória (ou no fim do arquivo)
+            while len(buffer) - start >= MAX_CHUNK_SIZE or (not data and start < len(buffer)):
+                cut = self._find_boundary(symbols, start, len(buffer))
+                yield buffer[start:cut]
+                start = cut
+            buffer = buffer[start:]
+            symbols = symbols[start:]
+            if not data:
+                return
+
+    def put_chunk(self, chunk: bytes) -> tuple:
+        """Grava o chunk se ainda não existir. Retorna (hash, bytes gravados)"""
+        chunk_hash = hashlib.blake2b(chunk, digest_size=20).hexdigest()
+        chunk_file = self.chunk_path(chunk_hash)
+        if os.path.exists(chunk_file):
+            return chunk_hash, 0
+
+        os.makedirs(os.path.dirname(chunk_file), exist_ok=True)
+        # Nome temporário único: dois workers podem gravar o mesmo chunk
+        tmp_file = f"{chunk_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(chunk)
+        os.replace(tmp_file, chunk_file)
+        if self.throttle is not None:
+            self.throttle(len(chunk))
+        return chunk_hash, len(chunk)
+
+    def store_file(self, source_file: str) -> Dict:
+        """Armazena um arquivo no repositório e retorna sua lista de chunks"""
+        chunks = []
+        written = 0
+        digest = hashlib.blake2b(digest_size=32)
+        with open(source_file, 'rb') as f:
+            for chunk in self.iter_chunks(f):
+                digest.update(chunk)
+                chunk_hash, chunk_written = self.put_chunk(chunk)
+                chunks.append([chunk_hash, len(chunk)])
+                written += chunk_written
+        return {'chunks': chunks, 'written': written, 'digest': digest.hexdigest()}
+
+    def write_recipe(self, files: Dict[str, Dict], source_path: str) -> str:
+        """Grava a receita deste backup (arquivo -> lista de chunks)"""
+        os.makedirs(self.recipes_path, exist_ok=True)
+        recipe_file = os.path.join(
+            self.recipes_path, f"{datetime.now().strftime(RECIPE_TIME_FORMAT)}_{source_key(source_path)}.json"
+        )
+        tmp_file = recipe_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(),
+                'source_path': os.path.abspath(source_path),
+                'files': files
+            }, f)
+        os.replace(tmp_file, recipe_file)
+        return recipe_file
+
+    def latest_recipe(self, source_path: str, until: Optional[datetime] = None) -> Optional[str]:
+        """Receita mais recente da origem `source_path`, opcionalmente gravada até `until`"""
+        try:
+            names = sorted(name for name in os.listdir(self.recipes_path) if name.endswith('.json'))
+        except OSError:
+            return None
+        key = source_key(source_path)
+        for name in reversed(names):
+            stem = name[:-len('.json')]
+            created, _, name_key = stem.rpartition('_')
+            if name_key != key:
+                continue
+            try:
+                if until is not None and datetime.strptime(created, RECIPE_TIME_FORMAT) > until:
+                    continue
+            except ValueError:
+                continue
+            return os.path.join(self.recipes_path, name)
+        return None
+
+    @staticmethod
+    def load_recipe(recipe_file: str) -> Dict:
+        with open(recipe_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def verify_file(self, file_info: Dict, checked: set) -> Optional[str]:
+        """Confere se todos os chunks de um arquivo existem com o tamanho certo"""
+        if sum(size for _, size in file_info['chunks']) != file_info['size']:
+            return "tamanho da receita difere do arquivo original"
+        for chunk_hash, size in file_info['chunks']:
+            if chunk_hash in checked:
+                continue
+            try:
+                if os.stat(self.chunk_path(chunk_hash)).st_size != size:
+                    return f"chunk {chunk_hash} com tamanho incorreto"
+            except OSError:
+                return f"chunk {chunk_hash} não encontrado"
+            checked.add(chunk_hash)
+        return None
+
+
+class ChunkStoreReader:
+    """Reconstrói arquivos a partir de uma receita do ChunkStore"""
+
+    def __init__(self, store: ChunkStore, recipe_file: str):
+        self.store = store
+        self.recipe = ChunkStore.load_recipe(recipe_file)
+
+    def list_files(self) -> List[str]:
+        return list(self.recipe['files'])
+
+    def iter_file(self, rel_path: str) -> Iterator[bytes]:
+        """Lê o conteúdo de um arquivo, chunk a chunk"""
+        for chunk_hash, _ in self.recipe['files'][rel_path]['chunks']:
+            with open(self.store.chunk_path(chunk_hash), 'rb') as f:
+                yield f.read()
+
+    def restore_file(self, rel_path: str, dest_file: str) -> None:
+        """Reconstrói um arquivo no destino, preservando a data de modificação"""
+        file_info = self.recipe['files'][rel_path]
+        os.makedirs(os.path.dirname(dest_file) or '.', exist_ok=True)
+        with open(dest_file, 'wb') as f:
+            for chunk in self.iter_file(rel_path):
+                f.write(chunk)
+        os.utime(dest_file, (file_info['mtime'], file_info['mtime']))
+
+    def restore(self, target_path: str, paths: Optional[List[str]] = None) -> int:
+        """Reconstrói todos os arquivos (ou apenas `paths`) em target_path"""
+        restored = 0
+        for rel_path in (paths if paths is not None else self.list_files()):
+            self.restore_file(rel_path, os.path.join(target_path, rel_path))
+            restored += 1
+        return restored
@@ -0,0 +1,79 @@
+import bz2
+import lzma
+import os
+import zlib
+
+from typing import Iterator
+
+# Codecs da biblioteca padrão: sufixo do arquivo gravado e nível padrão
+CODECS = {
+    'zlib': {'suffix': '.zz', 'level': 6},
+    'lzma': {'suffix': '.xz', 'level': 3},
+    'bz2': {'suffix': '.bz2', 'level': 9},
+}
+
+# Formatos que já são comprimidos: recomprimir só gasta CPU
+INCOMPRESSIBLE_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.mp3', '.mp4', '.m4a', '.mkv', '.avi', '.mov', '.wmv', '.ogg',
+    '.zip', '.7z', '.rar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.cab', '.jar',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.pdf', '.msi', '.apk',
+    '.zz',
+}
+# Amostra do início do arquivo usada para estimar a compressibilidade
+SAMPLE_SIZE = 64 * 1024
+# Razão máxima (comprimido / original) na amostra para valer a pena comprimir
+SAMPLE_MAX_RATIO = 0.9
+MIN_COMPRESS_SIZE = 512
+READ_SIZE = 1024 * 1024
+
+
+def codec_suffix(codec: str) -> str:
+    return CODECS[codec]['suffix']
+
+
+def new_compressor(codec: str, level=None):
+    level = CODECS[codec]['level'] if level is None else level
+    if codec == 'zlib':
+        return zlib.compressobj(level)
+    if codec == 'lzma':
+        return lzma.LZMACompressor(preset=level)
+    return bz2.BZ2Compressor(level)
+
+
+def is_compressible(path: str, size: int) -> bool:
+    """Decide pela extensão e por uma amostra comprimida rapidamente (zlib nível 1)"""
+    if size < MIN_COMPRESS_SIZE:
+        return False
+    if os.path.splitext(path)[1].lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return False
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_SIZE)
+    if not sample:
+        return False
+    return len(zlib.compress(sample, 1)) <= len(sample) * SAMPLE_MAX_RATIO
+
+
+def iter_decompressed(f, codec: str) -> Iterator[bytes]:
+    """Descomprime um arquivo aberto em blocos de tamanho limitado"""
+    if codec == 'zlib':
+        decompressor = zlib.decompressobj()
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+            while data:
+                yield decompressor.decompress(data, READ_SIZE)
+                data = decompressor.unconsumed_tail
+        yield decompressor.flush()
+        return
+
+    decompressor = lzma.LZMADecompressor() if codec == 'lzma' else bz2.BZ2Decompressor()
+    while not decompressor.eof:
+        data = f.read(READ_SIZE)
+        if not data:
+            raise EOFError("Arquivo comprimido truncado")
+        yield decompressor.decompress(data, READ_SIZE)
+        # Ainda há saída pendente sem precisar de mais entrada
+        while not decompressor.needs_input and not decompressor.eof:
+            yield decompressor.decompress(b'', READ_SIZE)
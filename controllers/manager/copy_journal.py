@@ -0,0 +1,89 @@
+import json
+import os
+import time
+
+from typing import Dict, Optional
+
+JOURNAL_FILENAME = '.bluemacaw_journal'
+# Registros acumulados antes de gravar (e sincronizar) o journal em disco
+JOURNAL_BATCH_SIZE = 256
+JOURNAL_FLUSH_SECONDS = 2.0
+
+
+class CopyJournal:
+    """Journal append-only dos arquivos concluídos, gravado no destino.
+
+    A primeira linha identifica a execução (chamado, origem, destino); cada
+    linha seguinte é um arquivo concluído. Um backup reiniciado com o mesmo
+    cabeçalho continua de onde parou."""
+
+    def __init__(self, target_path: str, header: Dict, before_flush=None):
+        self.path = os.path.join(target_path, JOURNAL_FILENAME)
+        self.header = header
+        # Chamado antes de gravar o lote (ex.: descarregar packs ainda em buffer)
+        self.before_flush = before_flush
+        self.last_path: Optional[str] = None
+        self._file = None
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def load(self) -> Dict[str, Dict]:
+        """Registros de uma execução interrompida com o mesmo cabeçalho"""
+        records = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                if json.loads(f.readline() or 'null') != self.header:
+                    return {}
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última linha cortada pela interrupção
+                        break
+                    records[record['p']] = record
+                    self.last_path = record['p']
+        except (OSError, ValueError):
+            return {}
+        return records
+
+    def start(self, resume: bool) -> None:
+        """Abre o journal: continua o anterior ou começa um novo"""
+        if resume:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            return
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write(json.dumps(self.header) + '\n')
+        self.flush(force=True)
+
+    def append(self, rel_path: str, size: int, mtime: float, result: Optional[Dict]) -> None:
+        self._pending.append(json.dumps({'p': rel_path, 's': size, 'm': mtime, 'r': result}))
+        if len(self._pending) >= JOURNAL_BATCH_SIZE \
+                or time.monotonic() - self._last_flush >= JOURNAL_FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        if self._file is None or (not self._pending and not force):
+            return
+        if self.before_flush is not None:
+            self.before_flush()
+        if self._pending:
+            self._file.write('\n'.join(self._pending) + '\n')
+            self._pending = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Grava o que falta e fecha, mantendo o journal para uma retomada"""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def complete(self) -> None:
+        """Backup concluído: o journal não é mais necessário"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
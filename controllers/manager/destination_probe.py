@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+PROBE_DIRNAME = '.bluemacaw_probe'
+# Tempo máximo do benchmark, verificado também dentro de cada medição:
+# ao estourar, a medição em curso termina com o que já foi gravado
+PROBE_TIME_BUDGET = 3.0
+SMALL_FILE_SIZE = 4 * 1024
+SMALL_FILES_PER_LEVEL = 32
+# A partir de 2: a leitura da origem se sobrepõe à gravação mesmo em destino local
+CONCURRENCY_LEVELS = (2, 4, 8, 16)
+BUFFER_SIZES = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+SEQUENTIAL_PROBE_BYTES = 8 * 1024 * 1024
+# Ganho mínimo para preferir mais workers ou um buffer maior
+MIN_IMPROVEMENT = 1.10
+
+
+def _write_small_file(path: str) -> None:
+    with open(path, 'wb') as f:
+        f.write(b'\0' * SMALL_FILE_SIZE)
+
+
+def _measure_concurrency(probe_path: str, workers: int, deadline: float) -> float:
+    """Arquivos pequenos criados por segundo com `workers` threads"""
+    paths = [os.path.join(probe_path, f"small_{workers}_{i}") for i in range(SMALL_FILES_PER_LEVEL)]
+
+    def write(path):
+        if time.perf_counter() > deadline:
+            return 0
+        _write_small_file(path)
+        return 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        created = sum(pool.map(write, paths))
+    elapsed = time.perf_counter() - started
+    for path in paths[:created]:
+        os.remove(path)
+    return created / max(elapsed, 1e-6)
+
+
+def _measure_sequential(probe_path: str, buffer_size: int, deadline: float) -> float:
+    """Vazão de escrita sequencial (bytes/s) com blocos de buffer_size, até o disco"""
+    path = os.path.join(probe_path, f"seq_{buffer_size}")
+    block = memoryview(bytes(buffer_size))
+    started = time.perf_counter()
+    with open(path, 'wb', buffering=0) as f:
+        written = 0
+        while written < SEQUENTIAL_PROBE_BYTES and time.perf_counter() <= deadline:
+            written += f.write(block)
+        # Sem fsync mediríamos apenas o cache de memória
+        os.fsync(f.fileno())
+    elapsed = time.perf_counter() - started
+    os.remove(path)
+    return written / max(elapsed, 1e-6)
+
+
+def probe_destination(dest_path: str) -> Dict:
+    """Benchmark curto do destino: latência de criação de arquivos pequenos,
+    concorrência e tamanho de buffer para escrita sequencial"""
+    probe_path = os.path.join(dest_path, PROBE_DIRNAME)
+    os.makedirs(probe_path, exist_ok=True)
+    deadline = time.perf_counter() + PROBE_TIME_BUDGET
+    result = {}
+    try:
+        started = time.perf_counter()
+        _write_small_file(os.path.join(probe_path, 'latency'))
+        os.remove(os.path.join(probe_path, 'latency'))
+        result['create_latency_ms'] = (time.perf_counter() - started) * 1000
+
+        # Mais workers só compensam enquanto a vazão de arquivos pequenos cresce
+        best_workers, best_rate = None, 0.0
+        for workers in CONCURRENCY_LEVELS:
+            if time.perf_counter() > deadline:
+                break
+            rate = _measure_concurrency(probe_path, workers, deadline)
+            if not rate:
+                break
+            if best_workers is None or rate > best_rate * MIN_IMPROVEMENT:
+                best_workers, best_rate = workers, rate
+            else:
+                break
+        if best_workers is not None:
+            result['copy_workers'] = best_workers
+            result['small_files_per_second'] = best_rate
+
+        best_buffer, best_throughput = None, 0.0
+        for buffer_size in BUFFER_SIZES:
+            if time.perf_counter() > deadline:
+                break
+            throughput = _measure_sequential(probe_path, buffer_size, deadline)
+            if not throughput:
+                break
+            if best_buffer is None or throughput > best_throughput * MIN_IMPROVEMENT:
+                best_buffer, best_throughput = buffer_size, throughput
+        if best_buffer is not None:
+            result['copy_buffer_size'] = best_buffer
+            result['write_throughput'] = best_throughput
+    finally:
+        shutil.rmtree(probe_path, ignore_errors=True)
+    return result
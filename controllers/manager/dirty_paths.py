@@ -0,0 +1,100 @@
+import os
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from models.dirty_path_model import DirtyPath
+from models.dirty_watermark_model import DirtyWatermark
+from models.watched_path_model import WatchedPath
+
+# Sem heartbeat neste intervalo o watcher é considerado parado
+HEARTBEAT_TIMEOUT_SECONDS = 60
+# Linhas por INSERT (limite de variáveis do SQLite)
+INSERT_BATCH_SIZE = 200
+
+
+class DirtyPathStore:
+    """Conjunto de caminhos alterados de uma origem, gravado no SQLite pelo
+    watcher e consumido pelos backups incrementais.
+
+    Uma origem pode ir para vários destinos: cada um guarda a sua marca (início
+    da varredura do último backup) e só são removidos os caminhos anteriores
+    à marca de todos os destinos"""
+
+    def __init__(self, source_path: str):
+        self.source_path = os.path.abspath(source_path)
+
+    def start(self) -> None:
+        """Início do monitoramento: alterações anteriores não são conhecidas"""
+        now = datetime.now()
+        DirtyPath.delete().where(DirtyPath.source_path == self.source_path).execute()
+        WatchedPath.insert(
+            source_path=self.source_path, started_at=now, heartbeat=now
+        ).on_conflict_replace().execute()
+
+    def stop(self) -> None:
+        WatchedPath.delete().where(WatchedPath.source_path == self.source_path).execute()
+
+    def heartbeat(self) -> None:
+        WatchedPath.update(heartbeat=datetime.now()).where(
+            WatchedPath.source_path == self.source_path
+        ).execute()
+
+    def mark_overflow(self) -> None:
+        """Eventos perdidos (fila do kernel cheia ou pasta sem watch): o conjunto
+        só volta a valer para backups cuja varredura comece depois deste ponto"""
+        WatchedPath.update(started_at=datetime.now(), overflows=WatchedPath.overflows + 1).where(
+            WatchedPath.source_path == self.source_path
+        ).execute()
+
+    def record(self, rel_paths: Iterable[str]) -> None:
+        now = datetime.now()
+        rows = [{'source_path': self.source_path, 'rel_path': rel_path, 'recorded_at': now} for rel_path in rel_paths]
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            # Caminho já presente: só atualiza a data, para não ser limpo por um backup em andamento
+            DirtyPath.insert_many(rows[start:start + INSERT_BATCH_SIZE]).on_conflict(
+                conflict_target=[DirtyPath.source_path, DirtyPath.rel_path],
+                preserve=[DirtyPath.recorded_at]
+            ).execute()
+
+    def snapshot(self, destination_path: str, since: float) -> Optional[List[str]]:
+        """Caminhos alterados depois de `since` (início da varredura do backup
+        anterior em destination_path), ou None se o conjunto não cobre todo o período"""
+        try:
+            state = WatchedPath.get(WatchedPath.source_path == self.source_path)
+        except WatchedPath.DoesNotExist:
+            return None
+        since = datetime.fromtimestamp(since)
+        if state.started_at > since:
+            return None
+        if datetime.now() - state.heartbeat > timedelta(seconds=HEARTBEAT_TIMEOUT_SECONDS):
+            return None
+        # Sem marca para o destino, caminhos de que ele precisa podem ter sido removidos
+        watermark = DirtyWatermark.get_or_none(
+            (DirtyWatermark.source_path == self.source_path) &
+            (DirtyWatermark.destination_path == os.path.abspath(destination_path))
+        )
+        if watermark is None or watermark.scanned_at > since:
+            return None
+        return [rel_path for rel_path, in DirtyPath.select(DirtyPath.rel_path).where(
+            (DirtyPath.source_path == self.source_path) & (DirtyPath.recorded_at > since)
+        ).tuples()]
+
+    def advance(self, destination_path: str, scanned_at: float, keep: Iterable[str] = ()) -> None:
+        """Backup gravado em destination_path com a varredura iniciada em
+        `scanned_at`: avança a marca do destino e remove os caminhos que nenhum
+        destino ainda precisa. `keep` volta ao conjunto (ex.: arquivos que falharam)"""
+        DirtyWatermark.insert(
+            source_path=self.source_path, destination_path=os.path.abspath(destination_path),
+            scanned_at=datetime.fromtimestamp(scanned_at)
+        ).on_conflict(
+            conflict_target=[DirtyWatermark.source_path, DirtyWatermark.destination_path],
+            preserve=[DirtyWatermark.scanned_at]
+        ).execute()
+        self.record(keep)
+        oldest = DirtyWatermark.select().where(
+            DirtyWatermark.source_path == self.source_path
+        ).order_by(DirtyWatermark.scanned_at).first()
+        DirtyPath.delete().where(
+            (DirtyPath.source_path == self.source_path) & (DirtyPath.recorded_at <= oldest.scanned_at)
+        ).execute()
@@ -1,11 +1,24 @@
 import threading
 import logging
 import os
+import sys
 
 from datetime import datetime
 from typing import Optional
 from models.backup_logs_model import BackupLog
 
+# Pasta dos arquivos de log (a CLI também aceita --log-dir)
+LOG_DIR_ENV = 'BLUEMACAW_LOG_DIR'
+
+def default_log_dir() -> str:
+    """Pasta de logs padrão da plataforma"""
+    if sys.platform == 'win32':
+        return "C:/BlueMacaw/logs/"
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Logs/BlueMacaw')
+    state_home = os.environ.get('XDG_STATE_HOME') or os.path.expanduser('~/.local/state')
+    return os.path.join(state_home, 'bluemacaw', 'logs')
+
 class LogManager:
     _instance: Optional['LogManager'] = None
     _lock = threading.Lock()
@@ -26,10 +39,8 @@ class LogManager:
         self._setup_logger()
 
     def _setup_logger(self):
-        log_dir = "C:/BlueMacaw/logs/"
-
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        log_dir = os.environ.get(LOG_DIR_ENV) or default_log_dir()
+        os.makedirs(log_dir, exist_ok=True)
 
         self.logger = logging.getLogger('BlueMacawBackup')
         self.logger.setLevel(logging.INFO)
@@ -39,7 +50,7 @@ class LogManager:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
 
-        log_filename = f"{log_dir}/backup_{datetime.now().strftime('%Y%m%d')}.log"
+        log_filename = os.path.join(log_dir, f"backup_{datetime.now().strftime('%Y%m%d')}.log")
         file_handler = logging.FileHandler(log_filename, encoding='utf-8')
         file_handler.setFormatter(formatter)
 
@@ -83,12 +94,47 @@ class LogManager:
                 total_size=kwargs.get('total_size', 0),
                 total_files=kwargs.get('total_files', 0),
                 copied_files=kwargs.get('copied_files', 0),
+                skipped_files=kwargs.get('skipped_files', 0),
+                compression_ratio=kwargs.get('compression_ratio', None),
+                compression_time=kwargs.get('compression_time', None),
+                copied_bytes=kwargs.get('copied_bytes', None),
+                copy_duration=kwargs.get('copy_duration', None),
                 status=kwargs.get('status', 'Concluído')
             )
             self.log_info(f"Backup registrado: {backup_type}")
         except Exception as e:
             self.log_error(f"Erro ao registrar backup: {str(e)}", e)
     
+    def get_average_throughput(self, source_path, destination_path, limit=10):
+        """Vazão média (bytes/s) da etapa de cópia dos últimos backups concluídos
+        entre origem e destino. Sem histórico para o par, usa os backups para o
+        mesmo destino. Registros antigos, sem bytes copiados, só entram se
+        nenhum arquivo ficou inalterado (total_size/duration seria inflado)"""
+        try:
+            base = BackupLog.select().where(
+                (BackupLog.status == 'Concluído') & (
+                    ((BackupLog.copied_bytes > 0) & (BackupLog.copy_duration > 0)) |
+                    (BackupLog.copied_bytes.is_null() &
+                     ((BackupLog.skipped_files == 0) | BackupLog.skipped_files.is_null()) &
+                     (BackupLog.duration > 0) & (BackupLog.total_size > 0))
+                )
+            )
+            for query in (
+                base.where((BackupLog.source_path == source_path) &
+                           (BackupLog.destination_path == destination_path)),
+                base.where(BackupLog.destination_path == destination_path)
+            ):
+                rows = list(query.order_by(BackupLog.end_time.desc()).limit(limit))
+                if rows:
+                    copied = sum(row.copied_bytes if row.copied_bytes is not None else row.total_size
+                                 for row in rows)
+                    seconds = sum(row.copy_duration if row.copied_bytes is not None else row.duration
+                                  for row in rows)
+                    return copied / seconds
+        except Exception as e:
+            self.log_warning(f"Histórico de vazão indisponível: {str(e)}")
+        return None
+
     def log_backup_error(self, user_id, backup_type, error_message):
         """Registra um erro de backup"""
         try:
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import threading
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+PACKS_DIRNAME = 'packs'
+PACK_INDEX_FILENAME = 'pack_index.json'
+# Tamanho a partir do qual um pack é fechado e outro é iniciado
+DEFAULT_MAX_PACK_SIZE = 1024 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+
+
+class PackWriter:
+    """Grava arquivos pequenos em sequência dentro de poucos arquivos de pack.
+
+    Cada thread escreve no seu próprio pack, então os workers não disputam lock
+    durante a gravação. O índice (caminho -> pack, offset, tamanho, hash) é
+    gravado separadamente por write_index."""
+
+    def __init__(self, root: str, max_pack_size: int = DEFAULT_MAX_PACK_SIZE, throttle=None):
+        self.root = root
+        # Chamado com os bytes gravados (limite de banda do BackupManager)
+        self.throttle = throttle
+        self.packs_path = os.path.join(root, PACKS_DIRNAME)
+        self.max_pack_size = max_pack_size
+        # Prefixo por execução (com microssegundos): packs de backups anteriores
+        # continuam válidos mesmo com duas execuções no mesmo segundo
+        self._prefix = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._local = threading.local()
+        self._open_files = []
+
+    def _pack_file(self):
+        """Pack aberto pela thread atual, trocado quando atinge o tamanho máximo"""
+        current = getattr(self._local, 'pack', None)
+        if current is not None and current[1].tell() < self.max_pack_size:
+            return current
+
+        with self._lock:
+            if not self._open_files:
+                os.makedirs(self.packs_path, exist_ok=True)
+            name = f"{self._prefix}_{self._counter:05d}.pack"
+            self._counter += 1
+            # 'xb': um pack existente nunca é truncado; a colisão vira erro
+            pack = open(os.path.join(self.packs_path, name), 'xb')
+            self._open_files.append(pack)
+        self._local.pack = (name, pack)
+        return self._local.pack
+
+    def add_file(self, source_file: str, digest_size: int = 32) -> Dict:
+        """Anexa o conteúdo de um arquivo ao pack da thread e retorna sua entrada no índice"""
+        name, pack = self._pack_file()
+        offset = pack.tell()
+        digest = hashlib.blake2b(digest_size=digest_size)
+        with open(source_file, 'rb') as src:
+            while True:
+                data = src.read(READ_SIZE)
+                if not data:
+                    break
+                digest.update(data)
+                pack.write(data)
+                if self.throttle is not None:
+                    self.throttle(len(data))
+        return {
+            'pack': name,
+            'offset': offset,
+            'length': pack.tell() - offset,
+            'digest': digest.hexdigest()
+        }
+
+    def flush(self) -> None:
+        """Descarrega os packs em disco (antes de registrar arquivos no journal)"""
+        with self._lock:
+            for pack in self._open_files:
+                pack.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            for pack in self._open_files:
+                pack.close()
+            self._open_files = []
+
+    def write_index(self, index: Dict[str, Dict]) -> str:
+        """Grava (de forma atômica) o índice de todos os arquivos empacotados"""
+        index_file = os.path.join(self.root, PACK_INDEX_FILENAME)
+        tmp_file = index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'created': datetime.now().isoformat(), 'files': index}, f)
+        os.replace(tmp_file, index_file)
+        return index_file
+
+
+class PackReader:
+    """Extrai arquivos dos packs pelo índice, sem percorrer o pack inteiro"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.packs_path = os.path.join(root, PACKS_DIRNAME)
+        self.index = self.load_index(root)
+
+    @staticmethod
+    def load_index(root: str) -> Dict[str, Dict]:
+        try:
+            with open(os.path.join(root, PACK_INDEX_FILENAME), 'r', encoding='utf-8') as f:
+                return json.load(f).get('files', {})
+        except (OSError, ValueError):
+            return {}
+
+    def list_files(self) -> List[str]:
+        return list(self.index)
+
+    def iter_file(self, rel_path: str) -> Iterator[bytes]:
+        """Lê o conteúdo de um arquivo direto do offset registrado no índice"""
+        info = self.index[rel_path]
+        remaining = info['length']
+        with open(os.path.join(self.packs_path, info['pack']), 'rb') as pack:
+            pack.seek(info['offset'])
+            while remaining:
+                data = pack.read(min(READ_SIZE, remaining))
+                if not data:
+                    raise EOFError(f"Pack {info['pack']} truncado")
+                remaining -= len(data)
+                yield data
+
+    def verify_file(self, rel_path: str, check_digest: bool = True) -> Optional[str]:
+        """Confere se o conteúdo empacotado está íntegro"""
+        info = self.index[rel_path]
+        try:
+            if not check_digest:
+                pack_size = os.path.getsize(os.path.join(self.packs_path, info['pack']))
+                return None if info['offset'] + info['length'] <= pack_size else "pack truncado"
+            digest = hashlib.blake2b(digest_size=len(info['digest']) // 2)
+            for data in self.iter_file(rel_path):
+                digest.update(data)
+        except (OSError, EOFError) as e:
+            return str(e)
+        return None if digest.hexdigest() == info['digest'] else "conteúdo diferente do índice"
+
+    def extract_file(self, rel_path: str, dest_file: str) -> None:
+        os.makedirs(os.path.dirname(dest_file) or '.', exist_ok=True)
+        with open(dest_file, 'wb') as f:
+            for data in self.iter_file(rel_path):
+                f.write(data)
+
+    def extract(self, target_path: str, paths: Optional[List[str]] = None) -> int:
+        """Extrai todos os arquivos (ou apenas `paths`) para target_path"""
+        extracted = 0
+        for rel_path in (paths if paths is not None else self.list_files()):
+            self.extract_file(rel_path, os.path.join(target_path, rel_path))
+            extracted += 1
+        return extracted
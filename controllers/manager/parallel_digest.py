@@ -0,0 +1,191 @@
+import hashlib
+import heapq
+import mmap
+import multiprocessing
+import os
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .backup_control import BackupCancelled, BackupControl
+from .compression import iter_decompressed
+
+# Arquivos a partir deste tamanho são lidos via mmap (sem cópia para buffers Python)
+MMAP_MIN_SIZE = 4 * 1024 * 1024
+# Bloco passado ao hash a cada chamada (fatias de memoryview, sem cópia)
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+# Lotes por worker: mais lotes equilibram melhor o fim da validação
+BATCHES_PER_WORKER = 4
+# Abaixo deste volume o custo de subir o pool não compensa
+MIN_PARALLEL_BYTES = 64 * 1024 * 1024
+# Intervalo em que a pausa/cancelamento é repassado aos processos de validação
+CONTROL_POLL_SECONDS = 0.2
+
+# Nos processos de validação: eventos (em execução, cancelado) do processo principal
+_shared_control = None
+
+
+def file_digest(path: str, digest_size: int, codec: Optional[str] = None,
+                checkpoint: Optional[Callable[[], None]] = None) -> str:
+    """Hash BLAKE2b de um arquivo gravado; com codec, do conteúdo descomprimido.
+    checkpoint é chamado a cada bloco (pausa/cancelamento)"""
+    digest = hashlib.blake2b(digest_size=digest_size)
+    if codec is not None:
+        with open(path, 'rb') as f:
+            for data in iter_decompressed(f, codec):
+                if checkpoint is not None:
+                    checkpoint()
+                digest.update(data)
+        return digest.hexdigest()
+
+    with open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, size, HASH_BLOCK_SIZE):
+                        if checkpoint is not None:
+                            checkpoint()
+                        digest.update(view[start:start + HASH_BLOCK_SIZE])
+                finally:
+                    # O mmap só fecha sem memoryviews exportadas
+                    view.release()
+            return digest.hexdigest()
+        while True:
+            if checkpoint is not None:
+                checkpoint()
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def chunks_digest(paths: List[str], digest_size: int,
+                  checkpoint: Optional[Callable[[], None]] = None) -> str:
+    """Hash BLAKE2b de um arquivo do repositório deduplicado, remontado a
+    partir dos arquivos dos seus chunks, na ordem da receita"""
+    digest = hashlib.blake2b(digest_size=digest_size)
+    for path in paths:
+        if checkpoint is not None:
+            checkpoint()
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _init_process(running, cancelled) -> None:
+    global _shared_control
+    _shared_control = (running, cancelled)
+
+
+def _shared_checkpoint() -> None:
+    """checkpoint dos processos de validação, pelos eventos compartilhados"""
+    running, cancelled = _shared_control
+    running.wait()
+    if cancelled.is_set():
+        raise BackupCancelled("Backup cancelado pelo usuário")
+
+
+def _digest_batch(batch: List[Tuple[str, str, Optional[str]]], digest_size: int,
+                  checkpoint: Optional[Callable[[], None]] = None) -> List[Tuple]:
+    """Executado nos workers: (arquivo, hash, erro) de cada item do lote.
+    Uma lista de caminhos são os chunks de um arquivo deduplicado"""
+    if checkpoint is None and _shared_control is not None:
+        checkpoint = _shared_checkpoint
+    results = []
+    for rel_path, path, codec in batch:
+        try:
+            if isinstance(path, list):
+                digest = chunks_digest(path, digest_size, checkpoint)
+            else:
+                digest = file_digest(path, digest_size, codec, checkpoint)
+            results.append((rel_path, digest, None))
+        except BackupCancelled:
+            raise
+        except Exception as e:
+            results.append((rel_path, None, str(e)))
+    return results
+
+
+def _balance(items: List[Tuple], batches: int) -> List[List[Tuple]]:
+    """Distribui os itens em lotes de volume parecido (maiores primeiro, lote mais leve)"""
+    batches = min(batches, len(items))
+    bins = [[] for _ in range(batches)]
+    heap = [(0, index) for index in range(batches)]
+    for size, item in sorted(items, key=lambda pair: pair[0], reverse=True):
+        total, index = heapq.heappop(heap)
+        bins[index].append(item)
+        heapq.heappush(heap, (total + size, index))
+    return bins
+
+
+def _process_context():
+    """Contexto dos processos de validação. O processo da interface já tem várias
+    threads (backup, observadores, watcher, Kivy), e um fork nesse estado pode
+    travar os filhos: forkserver onde existe, senão spawn"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def compute_digests(items: List[Tuple[int, Tuple[str, str, Optional[str]]]], digest_size: int,
+                    workers: Optional[int] = None, pool: Optional[str] = None,
+                    control: Optional[BackupControl] = None) -> Dict[str, Tuple]:
+    """Calcula os hashes em paralelo, com lotes balanceados por bytes.
+
+    items: (tamanho, (arquivo relativo, caminho ou lista de chunks, codec)). Retorna
+    arquivo -> (hash, erro). A pausa/cancelamento de `control` vale a cada
+    bloco lido, também dentro dos processos."""
+    checkpoint = control.checkpoint if control is not None else None
+    workers = workers or os.cpu_count() or 1
+    total = sum(size for size, _ in items)
+    if workers <= 1 or total < MIN_PARALLEL_BYTES or len(items) < 2:
+        results = {}
+        for _, item in items:
+            for rel_path, digest, error in _digest_batch([item], digest_size, checkpoint):
+                results[rel_path] = (digest, error)
+        return results
+
+    shared = None
+    # Threads por padrão: o BLAKE2b libera o GIL em blocos grandes
+    if pool == 'process':
+        context = _process_context()
+        shared = (context.Event(), context.Event())
+        shared[0].set()
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_process, initargs=shared
+        )
+        # Os processos usam os eventos compartilhados
+        checkpoint = None
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    results = {}
+    pending = {executor.submit(_digest_batch, batch, digest_size, checkpoint)
+               for batch in _balance(items, workers * BATCHES_PER_WORKER)}
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=CONTROL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            if control is not None:
+                if control.cancelled:
+                    raise BackupCancelled("Backup cancelado pelo usuário")
+                if shared is not None:
+                    if control.paused:
+                        shared[0].clear()
+                    else:
+                        shared[0].set()
+            for future in done:
+                for rel_path, digest, error in future.result():
+                    results[rel_path] = (digest, error)
+    except BaseException:
+        # Cancelado: lotes não iniciados são descartados e os em andamento
+        # param no próximo bloco; não espera por eles
+        if shared is not None:
+            shared[1].set()
+            shared[0].set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+    return results
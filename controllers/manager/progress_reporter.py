@@ -0,0 +1,75 @@
+import time
+
+from typing import Callable, Optional
+
+# Padrão de eventos progress_update por segundo (sobrescrito via backup_config)
+DEFAULT_PROGRESS_RATE = 4
+# Peso da amostra mais recente na média móvel da vazão
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class ProgressReporter:
+    """Agrega o progresso da cópia e notifica no máximo `rate` vezes por segundo.
+
+    Cada progress_update leva arquivos e bytes concluídos, a vazão atual em
+    MB/s, o tempo restante estimado pela média móvel da vazão e o arquivo mais
+    recente. Com `debug` cada arquivo também gera um evento file_copied."""
+
+    def __init__(self, notify: Callable, total_files: int, total_bytes: int,
+                 rate: float = DEFAULT_PROGRESS_RATE, debug: bool = False):
+        self.notify = notify
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.debug = debug
+        self.files_done = 0
+        self.bytes_done = 0
+        self.current_file = None
+        self.mb_per_second = 0.0
+        self._throughput = None
+        self._start = self._last_emit = time.monotonic()
+        self._last_bytes = 0
+
+    def advance(self, rel_path: str, size: int, files: Optional[int] = None) -> None:
+        """Registra um arquivo concluído; `files` informa a contagem quando o
+        chamador já a mantém (ex.: cópias e hardlinks somados)"""
+        self.files_done = files if files is not None else self.files_done + 1
+        self.bytes_done += size
+        self.current_file = rel_path
+        if self.debug:
+            self.notify("file_copied", {"file": rel_path, "size": size})
+        if time.monotonic() - self._last_emit >= self.interval:
+            self._emit()
+
+    def finish(self) -> None:
+        """Último evento, sempre emitido, com os totais finais"""
+        self._emit()
+
+    def _emit(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_emit
+        if elapsed > 0:
+            sample = (self.bytes_done - self._last_bytes) / elapsed
+            self._throughput = sample if self._throughput is None else \
+                THROUGHPUT_SMOOTHING * sample + (1 - THROUGHPUT_SMOOTHING) * self._throughput
+        self._last_emit = now
+        self._last_bytes = self.bytes_done
+        self.mb_per_second = (self._throughput or 0.0) / (1024 * 1024)
+
+        eta = None
+        remaining = max(0, self.total_bytes - self.bytes_done)
+        if remaining == 0 and self.files_done >= self.total_files:
+            eta = 0.0
+        elif self._throughput:
+            eta = remaining / self._throughput
+        self.notify("progress_update", {
+            "progress": int(self.files_done / self.total_files * 100) if self.total_files else 100,
+            "files_copied": self.files_done,
+            "total_files": self.total_files,
+            "bytes_copied": self.bytes_done,
+            "total_bytes": self.total_bytes,
+            "mb_per_second": self.mb_per_second,
+            "eta_seconds": eta,
+            "current_file": self.current_file,
+            "elapsed": now - self._start
+        })
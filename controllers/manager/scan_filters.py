@@ -0,0 +1,182 @@
+import hashlib
+import json
+import re
+import sys
+import time
+
+from typing import Dict, List, Optional
+
+# Exclusões sugeridas para estações de trabalho (lixeira, caches, temporários)
+DEFAULT_EXCLUDES = [
+    'node_modules/',
+    '$RECYCLE.BIN/',
+    'System Volume Information/',
+    '**/AppData/Local/Temp/',
+    '**/AppData/Local/Google/Chrome/User Data/*/Cache/',
+    '**/AppData/Local/Google/Chrome/User Data/*/Code Cache/',
+    '**/AppData/Local/Microsoft/Edge/User Data/*/Cache/',
+    '**/AppData/Local/Mozilla/Firefox/Profiles/*/cache2/',
+    '__pycache__/',
+    '*.tmp',
+    '~$*',
+    'Thumbs.db',
+    'pagefile.sys',
+    'hiberfil.sys',
+    'swapfile.sys',
+]
+
+# Windows e macOS: nomes de arquivo sem distinção de maiúsculas
+_FLAGS = re.IGNORECASE if sys.platform in ('win32', 'darwin') else 0
+
+
+def _glob_to_regex(pattern: str) -> str:
+    """Traduz um glob no estilo .gitignore (*, ?, [..], **) para regex"""
+    result = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            result.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            result.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            result.append('[^/]*')
+        elif char == '?':
+            result.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                result.append(f'[{body}]')
+                i = end
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return ''.join(result)
+
+
+class _Rule:
+    """Uma linha das regras: padrão, negação (!) e se vale só para pastas (/ no fim)"""
+
+    def __init__(self, pattern: str):
+        self.negated = pattern.startswith('!')
+        pattern = pattern[1:] if self.negated else pattern
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        # Com '/' no padrão ele é relativo à raiz da origem; sem, vale em qualquer nível
+        prefix = '' if '/' in pattern else '(?:.*/)?'
+        self.regex = re.compile(f'^{prefix}{_glob_to_regex(pattern.lstrip("/"))}$', _FLAGS)
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        return (is_dir or not self.dir_only) and self.regex.match(rel_path) is not None
+
+
+class ScanFilter:
+    """Regras de inclusão/exclusão aplicadas durante a varredura da origem.
+
+    exclude: globs no estilo .gitignore (a última regra que casa decide;
+    '!padrão' reinclui, '/' no fim vale só para pastas). include: se
+    informado, apenas arquivos que casam com algum destes globs entram
+    ('pasta/' inclui tudo o que está abaixo da pasta).
+    max_file_size_mb / max_age_days descartam arquivos grandes ou antigos.
+    Pastas excluídas não são percorridas."""
+
+    def __init__(self, exclude: Optional[List[str]] = None, include: Optional[List[str]] = None,
+                 max_file_size_mb: Optional[float] = None, max_age_days: Optional[float] = None):
+        self.config = {
+            'exclude': list(exclude or []),
+            'include': list(include or []),
+            'max_file_size_mb': max_file_size_mb,
+            'max_age_days': max_age_days
+        }
+        self.exclude_rules = [_Rule(pattern) for pattern in self.config['exclude'] if pattern.strip()]
+        # Sem negações a ordem não importa: as regras viram uma única regex por tipo
+        self._combined = None
+        if not any(rule.negated for rule in self.exclude_rules):
+            self._combined = {
+                is_dir: self._join([rule for rule in self.exclude_rules if is_dir or not rule.dir_only])
+                for is_dir in (False, True)
+            }
+        self.include_rules = [_Rule(pattern) for pattern in self.config['include'] if pattern.strip()]
+        self.max_size = int(max_file_size_mb * 1024 * 1024) if max_file_size_mb is not None else None
+        self.min_mtime = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, backup_config: Dict) -> Optional['ScanFilter']:
+        """Filtro definido no backup_config, ou None se não há regras"""
+        keys = ('exclude', 'include', 'max_file_size_mb', 'max_age_days')
+        if not any(backup_config.get(key) for key in keys):
+            return None
+        return cls(**{key: backup_config.get(key) for key in keys})
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifica as regras (o manifesto anterior só vale com as mesmas regras)"""
+        return hashlib.blake2b(json.dumps(self.config, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+    def reset_stats(self) -> None:
+        self.excluded_dirs = 0
+        self.excluded_files = 0
+        self.excluded_bytes = 0
+
+    @staticmethod
+    def _join(rules: List[_Rule]):
+        if not rules:
+            return None
+        return re.compile('|'.join(f'(?:{rule.regex.pattern})' for rule in rules), _FLAGS)
+
+    def _excluded(self, rel_path: str, is_dir: bool) -> bool:
+        if self._combined is not None:
+            regex = self._combined[is_dir]
+            return regex is not None and regex.match(rel_path) is not None
+        excluded = False
+        for rule in self.exclude_rules:
+            if rule.matches(rel_path, is_dir):
+                excluded = not rule.negated
+        return excluded
+
+    def skip_dir(self, rel_path: str) -> bool:
+        """Pasta excluída: não é percorrida"""
+        if self._excluded(rel_path.replace('\\', '/'), True):
+            self.excluded_dirs += 1
+            return True
+        return False
+
+    def in_excluded_dir(self, rel_path: str) -> bool:
+        """Indica se alguma pasta acima de rel_path está excluída (caminhos
+        recebidos fora da varredura, como os do watcher)"""
+        parts = rel_path.replace('\\', '/').split('/')[:-1]
+        return any(self._excluded('/'.join(parts[:depth]), True) for depth in range(1, len(parts) + 1))
+
+    def _included(self, rel_path: str) -> bool:
+        """Arquivo casa com alguma regra de inclusão; as de pasta ('/' no fim)
+        casam com qualquer pasta acima do arquivo"""
+        parts = rel_path.split('/')
+        parents = ['/'.join(parts[:depth]) for depth in range(1, len(parts))]
+        return any(
+            any(rule.matches(parent, True) for parent in parents) if rule.dir_only
+            else rule.matches(rel_path, False)
+            for rule in self.include_rules
+        )
+
+    def skip_file(self, rel_path: str, size: int, mtime: float) -> bool:
+        rel_path = rel_path.replace('\\', '/')
+        skipped = (
+            self._excluded(rel_path, False)
+            or (self.include_rules and not self._included(rel_path))
+            or (self.max_size is not None and size > self.max_size)
+            or (self.min_mtime is not None and mtime < self.min_mtime)
+        )
+        if skipped:
+            self.excluded_files += 1
+            self.excluded_bytes += size
+        return bool(skipped)
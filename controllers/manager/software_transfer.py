@@ -0,0 +1,45 @@
+import os
+import shutil
+
+from typing import Callable, List, Optional, Tuple
+
+# Instaladores oferecidos na etapa de transferência de software
+INSTALLER_EXTENSIONS = ('.exe', '.msi')
+
+
+def list_installers(software_dir: str) -> List[str]:
+    """Caminhos dos instaladores em software_dir (vazio se a pasta não existe)"""
+    if not software_dir or not os.path.isdir(software_dir):
+        return []
+    return sorted(
+        os.path.join(software_dir, name) for name in os.listdir(software_dir)
+        if name.lower().endswith(INSTALLER_EXTENSIONS)
+    )
+
+
+def copy_installers(files: List[str], destination_path: str,
+                    notify: Optional[Callable] = None) -> Tuple[int, int]:
+    """Copia os instaladores para destination_path. notify(event_type, data)
+    recebe software_copied ou error a cada arquivo. Retorna (copiados, tamanho total)"""
+    total_files = len(files)
+    total_size = sum(os.path.getsize(file_path) for file_path in files)
+    copied_files = 0
+    os.makedirs(destination_path, exist_ok=True)
+
+    for file_path in files:
+        try:
+            shutil.copy2(file_path, os.path.join(destination_path, os.path.basename(file_path)))
+            copied_files += 1
+            if notify is not None:
+                notify("software_copied", {
+                    "file": os.path.basename(file_path),
+                    "files_copied": copied_files,
+                    "total_files": total_files
+                })
+        except Exception as e:
+            if notify is not None:
+                notify("error", {
+                    "error_type": "inaccessible_file",
+                    "message": f"Erro ao copiar {file_path}: {str(e)}"
+                })
+    return copied_files, total_size
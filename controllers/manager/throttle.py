@@ -0,0 +1,105 @@
+import ctypes
+import os
+import platform
+import sys
+import threading
+import time
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Reavaliação da janela de horário da agenda (segundos)
+SCHEDULE_CHECK_SECONDS = 30.0
+
+# ioprio_set (Linux): número da syscall por arquitetura
+_IOPRIO_SET_SYSCALLS = {'x86_64': 251, 'amd64': 251, 'i386': 289, 'i686': 289, 'aarch64': 30, 'arm64': 30, 'armv7l': 314}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_BE = 2
+_IOPRIO_CLASS_SHIFT = 13
+# Windows: prioridade de segundo plano (CPU e I/O) para a thread atual
+_THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+LOW_PRIORITY_NICE = 10
+
+
+def _parse_time(value: str) -> int:
+    """'HH:MM' -> minutos desde a meia-noite"""
+    hours, minutes = value.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+class RateLimiter:
+    """Token bucket compartilhado pelos workers da cópia, em MB/s.
+
+    Com uma agenda (lista de {'start': 'HH:MM', 'end': 'HH:MM', 'limit_mbps': x}),
+    o limite segue a janela de horário atual; fora das janelas vale limit_mbps.
+    Limite None significa sem limitação."""
+
+    def __init__(self, limit_mbps: Optional[float] = None, schedule: Optional[List[Dict]] = None):
+        self.limit_mbps = limit_mbps
+        self.schedule = [
+            (_parse_time(window['start']), _parse_time(window['end']), window.get('limit_mbps'))
+            for window in (schedule or [])
+        ]
+        self._lock = threading.Lock()
+        self._rate = self._rate_for_now()
+        self._rate_checked = time.monotonic()
+        self._tokens = self._rate or 0.0
+        self._last = time.monotonic()
+
+    def _rate_for_now(self) -> Optional[float]:
+        """Limite em bytes/s para o horário atual"""
+        limit = self.limit_mbps
+        if self.schedule:
+            now = datetime.now()
+            minute = now.hour * 60 + now.minute
+            for start, end, window_limit in self.schedule:
+                # Janela que atravessa a meia-noite (ex.: 22:00 -> 06:00)
+                inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+                if inside:
+                    limit = window_limit
+                    break
+        return limit * 1024 * 1024 if limit else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit_mbps is not None or bool(self.schedule)
+
+    def consume(self, nbytes: int) -> None:
+        """Aguarda até haver orçamento para transferir nbytes"""
+        if not self.enabled or nbytes <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self.schedule and now - self._rate_checked >= SCHEDULE_CHECK_SECONDS:
+                self._rate = self._rate_for_now()
+                self._rate_checked = now
+            rate = self._rate
+            if rate is None:
+                self._last = now
+                return
+            # Rajada máxima de um segundo; o saldo negativo é a espera de quem consumiu
+            self._tokens = min(rate, self._tokens + (now - self._last) * rate) - nbytes
+            self._last = now
+            wait = -self._tokens / rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+def lower_thread_priority() -> bool:
+    """Reduz a prioridade de CPU e de I/O da thread atual (worker da cópia)"""
+    try:
+        if sys.platform == 'win32':
+            kernel32 = ctypes.windll.kernel32
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), _THREAD_MODE_BACKGROUND_BEGIN))
+
+        # No Linux nice e ioprio com pid 0 valem para a thread que chama
+        os.setpriority(os.PRIO_PROCESS, 0, max(os.getpriority(os.PRIO_PROCESS, 0), LOW_PRIORITY_NICE))
+        syscall_number = _IOPRIO_SET_SYSCALLS.get(platform.machine().lower())
+        if sys.platform.startswith('linux') and syscall_number is not None:
+            libc = ctypes.CDLL(None, use_errno=True)
+            # Classe best-effort com a menor prioridade (7)
+            ioprio = (_IOPRIO_CLASS_BE << _IOPRIO_CLASS_SHIFT) | 7
+            libc.syscall(syscall_number, _IOPRIO_WHO_PROCESS, 0, ioprio)
+        return True
+    except (OSError, AttributeError, ValueError):
+        return False
@@ -0,0 +1,193 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from typing import Dict, Set
+
+from .backup_manager import scan_tree
+from .dirty_paths import DirtyPathStore
+from .log_manager import LogManager
+
+# Máscaras do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+READ_SIZE = 64 * 1024
+# Intervalo de gravação dos caminhos alterados e do heartbeat no SQLite
+FLUSH_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15.0
+
+
+class WatcherService:
+    """Monitora a origem com inotify (Linux) e registra os caminhos alterados
+    no SQLite, para o próximo backup incremental não varrer a árvore inteira.
+
+    Pastas criadas ou movidas para dentro da origem são registradas inteiras
+    e passam a ser monitoradas; uma perda de eventos faz o próximo backup
+    voltar à varredura completa."""
+
+    def __init__(self, source_path: str):
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "Watcher disponível apenas no Linux (inotify)")
+        self.source_path = os.path.abspath(source_path)
+        self.store = DirtyPathStore(self.source_path)
+        self.log_manager = LogManager()
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+        self._dirty: Set[str] = set()
+        self._overflowed = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Inicia o monitoramento em uma thread em segundo plano"""
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.store.start()
+        self._watch_tree("")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='bluemacaw-watcher', daemon=True)
+        self._thread.start()
+        self.log_manager.log_info(f"Watcher ativo em {self.source_path}: {len(self._watches)} pasta(s)")
+
+    def stop(self) -> None:
+        """Encerra o monitoramento; o próximo backup volta à varredura completa"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self.store.stop()
+
+    def run_forever(self) -> None:
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _add_watch(self, rel_dir: str) -> None:
+        path = os.path.join(self.source_path, rel_dir)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                # Pasta removida antes de ser monitorada: o evento da pasta pai já a registrou
+                return
+            # ENOSPC: limite fs.inotify.max_user_watches; sem watch não há garantia
+            self.log_manager.log_warning(f"Não foi possível monitorar {path}: {os.strerror(error)}")
+            self._overflowed = True
+            return
+        self._watches[wd] = rel_dir
+
+    def _watch_tree(self, rel_root: str) -> None:
+        """Monitora rel_root e todas as subpastas, usando a varredura do backup"""
+        dirs = []
+        scan_tree(self.source_path, rel_root, dirs)
+        self._add_watch(rel_root)
+        for rel_dir in dirs:
+            self._add_watch(rel_dir)
+
+    def _handle(self, wd: int, mask: int, name: str) -> None:
+        if mask & IN_Q_OVERFLOW:
+            self._overflowed = True
+            return
+        if mask & IN_IGNORED:
+            self._watches.pop(wd, None)
+            return
+        rel_dir = self._watches.get(wd)
+        if rel_dir is None:
+            return
+        if not name:
+            # Evento da própria pasta (removida ou movida): a pasta pai registra o caminho
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) and rel_dir == "":
+                self._overflowed = True
+            return
+        rel_path = os.path.join(rel_dir, name)
+        self._dirty.add(rel_path)
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            self._watch_tree(rel_path)
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self._fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            self._handle(wd, mask, os.fsdecode(name))
+
+    def _flush(self) -> None:
+        if self._dirty:
+            dirty, self._dirty = self._dirty, set()
+            self.store.record(dirty)
+        if self._overflowed:
+            self.store.mark_overflow()
+            self._overflowed = False
+
+    def _run(self) -> None:
+        last_flush = last_heartbeat = time.monotonic()
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], FLUSH_SECONDS)
+            if readable:
+                self._read_events()
+            now = time.monotonic()
+            try:
+                if now - last_flush >= FLUSH_SECONDS:
+                    self._flush()
+                    last_flush = now
+                if now - last_heartbeat >= HEARTBEAT_SECONDS:
+                    self.store.heartbeat()
+                    last_heartbeat = now
+            except Exception as e:
+                # Falha ao gravar: os caminhos podem ter se perdido
+                self.log_manager.log_error("Erro ao registrar caminhos alterados", e)
+                self._overflowed = True
+        self._flush()
+
+
+def main():
+    """Executa o watcher sem a interface: python -m controllers.manager.watcher_service <origem>"""
+    from db import db_conn
+    db_conn.init_db()
+    if len(sys.argv) != 2:
+        print("Uso: python -m controllers.manager.watcher_service <pasta de origem>")
+        sys.exit(2)
+    WatcherService(sys.argv[1]).run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 import os
-import shutil
 import time
 import tkinter as tk
 
@@ -16,6 +15,7 @@ from kivy.uix.label import Label
 from kivy.graphics import Color, Rectangle, InstructionGroup
 
 from controllers.manager.user_session_manager import UserSessionManager
+from controllers.manager.software_transfer import copy_installers, list_installers
 
 from .manager.log_manager import LogManager
 from .manager.backup_session_manager import BackupSessionManager
@@ -57,13 +57,11 @@ class TransferSoftwareScreen(Screen):
             return
 
         # Lista todos os executáveis no diretório
-        for file in os.listdir(software_dir):
-            if file.endswith(('.exe', '.msi')):
-                file_path = os.path.join(software_dir, file)
-                size = self.get_file_size(file_path)
-                software_item = SoftwareItem(name=file, size=size, file_path=file_path)
-                self.software_items.append(software_item)
-                self.ids.software_list.add_widget(software_item)
+        for file_path in list_installers(software_dir):
+            size = self.get_file_size(file_path)
+            software_item = SoftwareItem(name=os.path.basename(file_path), size=size, file_path=file_path)
+            self.software_items.append(software_item)
+            self.ids.software_list.add_widget(software_item)
 
     def get_file_size(self, file_path):
         """Converte o tamanho do arquivo para uma string legível"""
@@ -156,7 +154,12 @@ class TransferSoftwareScreen(Screen):
             destination_path=summary['destination_path'],
             total_size=summary['file_backup_size'],
             total_files=summary['file_backup_files'],
-            copied_files=summary['file_backup_files'],
+            copied_files=summary['file_backup_copied'],
+            skipped_files=summary['file_backup_skipped'],
+            compression_ratio=summary['compression_ratio'],
+            compression_time=summary['compression_time'],
+            copied_bytes=summary['copied_bytes'],
+            copy_duration=summary['copy_duration'],
             status='Concluído'
         )
         
@@ -175,29 +178,18 @@ class TransferSoftwareScreen(Screen):
     def copy_software(self, selected_software, destination_path):
         """Copia os softwares selecionados para o destino"""
         total_files = len(selected_software)
-        total_size = 0
-        copied_files = 0
         
         print(f"Iniciando cópia de {total_files} arquivos para {destination_path}")
         
-        # Calcula o tamanho total
-        for item in selected_software:
-            total_size += os.path.getsize(item.file_path)
+        def report(event_type, data):
+            if event_type == "software_copied":
+                print(f"✓ Copiado: {data['file']} ({data['files_copied']}/{data['total_files']})")
+            else:
+                print(f"✗ {data['message']}")
         
-        # Copia cada arquivo
-        for item in selected_software:
-            try:
-                source_file = item.file_path
-                dest_file = os.path.join(destination_path, os.path.basename(source_file))
-                
-                print(f"Copiando: {os.path.basename(source_file)}...")
-                shutil.copy2(source_file, dest_file)
-                copied_files += 1
-                
-                print(f"✓ Copiado: {os.path.basename(source_file)} ({copied_files}/{total_files})")
-                
-            except Exception as e:
-                print(f"✗ Erro ao copiar {item.file_path}: {str(e)}")
+        copied_files, total_size = copy_installers(
+            [item.file_path for item in selected_software], destination_path, report
+        )
         
         # Define o fim do backup se ainda não foi definido
         if not self.backup_session.end_time:
@@ -251,7 +243,12 @@ class TransferSoftwareScreen(Screen):
             destination_path=summary['destination_path'],
             total_size=summary['total_size'],
             total_files=summary['total_files'],
-            copied_files=summary['total_files'],
+            copied_files=summary['copied_files'],
+            skipped_files=summary['file_backup_skipped'],
+            compression_ratio=summary['compression_ratio'],
+            compression_time=summary['compression_time'],
+            copied_bytes=summary['copied_bytes'],
+            copy_duration=summary['copy_duration'],
             status='Concluído'
         )
         
@@ -1,10 +1,28 @@
 import os
 
 from peewee import SqliteDatabase
+from playhouse.migrate import SqliteMigrator, migrate
 
 from db.database import db_proxy
 from models.users_model import UserModel
 from models.backup_logs_model import BackupLog
+from models.watched_path_model import WatchedPath
+from models.dirty_path_model import DirtyPath
+from models.dirty_watermark_model import DirtyWatermark
+
+def _add_missing_columns(db, model):
+    """Adiciona a bancos já existentes as colunas novas (anuláveis) do modelo"""
+    table_name = model._meta.table_name
+    existing = {column.name for column in db.get_columns(table_name)}
+    migrator = SqliteMigrator(db)
+    operations = [
+        migrator.add_column(table_name, field.column_name, field)
+        for field in model._meta.sorted_fields
+        if field.column_name not in existing and field.null
+    ]
+    if operations:
+        migrate(*operations)
+        print(f"Tabela '{table_name}' atualizada com {len(operations)} nova(s) coluna(s).")
 
 def init_db():
     try:
@@ -20,8 +38,9 @@ def init_db():
         db.connect()
         print("Conexão com o banco de dados estabelecida.")
         
-        # Cria as tabelas de usuários e backup logs
-        db.create_tables([UserModel, BackupLog], safe=True)
+        # Cria as tabelas de usuários, backup logs e do watcher da origem
+        db.create_tables([UserModel, BackupLog, WatchedPath, DirtyPath, DirtyWatermark], safe=True)
+        _add_missing_columns(db, BackupLog)
 
         print("Tabelas 'users' e 'backup_logs' verificadas/criadas com sucesso.")
     except Exception as e:
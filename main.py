@@ -41,6 +41,10 @@ class MainApp(App):
         # Agendar centralização após a janela estar completamente renderizada
         Clock.schedule_once(self._center_window, 0.1)
     
+    def on_stop(self):
+        # Um backup em andamento (ou pausado) impediria o processo de encerrar
+        self.root.get_screen('backup_start_screen').shutdown()
+
     def _center_window(self, dt):
         """Centraliza a janela na tela"""
         try:
@@ -15,6 +15,11 @@ class BackupLog(Model):
     total_size = FloatField(null=True)
     total_files = IntegerField(null=True)
     copied_files = IntegerField(null=True)
+    skipped_files = IntegerField(null=True)  # Inalterados no backup incremental
+    compression_ratio = FloatField(null=True)  # Tamanho gravado / original
+    compression_time = FloatField(null=True)  # Segundos gastos comprimindo
+    copied_bytes = FloatField(null=True)  # Bytes efetivamente copiados (sem inalterados/hardlinks)
+    copy_duration = FloatField(null=True)  # Segundos da etapa de cópia
     status = CharField(default='Em progresso')  # Concluído, Parcial, Falha, Interrompido
     
     class Meta:
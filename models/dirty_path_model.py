@@ -0,0 +1,17 @@
+import peewee
+
+from datetime import datetime
+from models.base_model import (BaseModel)
+
+class DirtyPath(BaseModel):
+    """Caminho alterado na origem desde o último backup (arquivo ou pasta)"""
+    dirty_id = peewee.AutoField(primary_key=True)
+    source_path = peewee.CharField()
+    rel_path = peewee.CharField()
+    recorded_at = peewee.DateTimeField(default=datetime.now)
+
+    class Meta:
+        table_name = 'dirty_paths'
+        indexes = (
+            (('source_path', 'rel_path'), True),
+        )
@@ -0,0 +1,16 @@
+import peewee
+
+from models.base_model import (BaseModel)
+
+class DirtyWatermark(BaseModel):
+    """Até quando cada destino está em dia com os caminhos alterados de uma origem"""
+    watermark_id = peewee.AutoField(primary_key=True)
+    source_path = peewee.CharField()
+    destination_path = peewee.CharField()
+    scanned_at = peewee.DateTimeField()  # Início da varredura do último backup gravado no destino
+
+    class Meta:
+        table_name = 'dirty_watermarks'
+        indexes = (
+            (('source_path', 'destination_path'), True),
+        )
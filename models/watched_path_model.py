@@ -0,0 +1,15 @@
+import peewee
+
+from datetime import datetime
+from models.base_model import (BaseModel)
+
+class WatchedPath(BaseModel):
+    """Origem monitorada pelo watcher (inotify) e estado do monitoramento"""
+    source_path = peewee.CharField(unique=True)
+    # Desde quando o conjunto de caminhos alterados está completo (reinicia ao perder eventos)
+    started_at = peewee.DateTimeField(default=datetime.now)
+    heartbeat = peewee.DateTimeField(default=datetime.now)  # Última confirmação de que o watcher está ativo
+    overflows = peewee.IntegerField(default=0)  # Vezes em que eventos foram perdidos
+
+    class Meta:
+        table_name = 'watched_paths'
@@ -1,4 +1,9 @@
+import queue
+import threading
+import time
+
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import List, Dict, Any
 from controllers.manager.backup_session_manager import BackupSessionManager
 from controllers.manager.log_manager import LogManager       
@@ -19,6 +24,8 @@ class BackupLogObserver(Observer):
         """Implementação do método do BackupObserver"""
         if event_type == "backup_started":
             self.update_status('init_status', 'Iniciando backup...', True)
+        elif event_type == "restore_started":
+            self.update_status('init_status', 'Iniciando restauração...', True)
         elif event_type == "checking_connectivity":
             self.update_status('connectivity_status', 'Verificando conectividade e permissões...', True)
         elif event_type == "environment_ready":
@@ -26,14 +33,40 @@ class BackupLogObserver(Observer):
         elif event_type == "counting_files":
             total_files = data.get('total_files', 0)
             total_size = data.get('total_size', 0)
-            self.update_status('files_count_status', f'Total de arquivos: {total_files} arquivos / {total_size:.2f} GB', True)
+            message = f'Total de arquivos: {total_files} arquivos / {total_size:.2f} GB'
+            if data.get('excluded_files') or data.get('excluded_dirs'):
+                message += (f" — ignorados: {data.get('excluded_files', 0)} arquivos "
+                            f"({data.get('excluded_size', 0) / (1024 * 1024 * 1024):.2f} GB), "
+                            f"{data.get('excluded_dirs', 0)} pastas")
+            self.update_status('files_count_status', message, True)
+        elif event_type == "backup_planned":
+            free_gb = data.get('free_space', 0) / (1024 * 1024 * 1024)
+            required_gb = data.get('required_space', 0) / (1024 * 1024 * 1024)
+            message = f'Espaço no destino: {required_gb:.2f} GB necessários / {free_gb:.2f} GB livres'
+            estimated = data.get('estimated_duration')
+            if estimated is not None:
+                hours, remainder = divmod(int(estimated), 3600)
+                minutes, seconds = divmod(remainder, 60)
+                message += f' — tempo estimado: {hours:02d}:{minutes:02d}:{seconds:02d}'
+            self.update_status('plan_status', message, data.get('required_space', 0) <= data.get('free_space', 0))
         elif event_type == "copying_files":
             self.update_status('copy_status', 'Copiando arquivos...', True)
         elif event_type == "progress_update":
             progress = data.get('progress', 0)
             files_copied = data.get('files_copied', 0)
             total_files = data.get('total_files', 0)
-            self.update_status('progress_status', f"Progresso: {progress}% concluído — {files_copied} de {total_files} arquivos copiados.", True)
+            message = f"Progresso: {progress}% concluído — {files_copied} de {total_files} arquivos copiados"
+            if 'mb_per_second' in data:
+                message += f" — {data['mb_per_second']:.1f} MB/s"
+            eta = data.get('eta_seconds')
+            if eta is not None and progress < 100:
+                hours, remainder = divmod(int(eta), 3600)
+                minutes, seconds = divmod(remainder, 60)
+                message += f" — restante: {hours:02d}:{minutes:02d}:{seconds:02d}"
+            if data.get('current_file') and progress < 100:
+                message += f" — {data['current_file']}"
+            # Progresso só atualiza o label; o log registra as etapas
+            self.update_status('progress_status', message + ".", True, log=False)
         elif event_type == "validating":
             self.update_status('validation_status', 'Verificando integridade dos arquivos...', True)
         elif event_type == "backup_registered":
@@ -57,13 +90,27 @@ class BackupLogObserver(Observer):
                 files=data.get('total_files', 0),
                 size=total_size_bytes,
                 source=self.screen.ids.source_path_input.text,
-                destination=self.screen.ids.destination_path_input.text
+                destination=self.screen.ids.destination_path_input.text,
+                copied=data.get('copied_files'),
+                skipped=data.get('skipped_files', 0),
+                compression_ratio=data.get('compression_ratio'),
+                compression_time=data.get('compression_time'),
+                copied_bytes=data.get('copied_bytes'),
+                copy_duration=data.get('copy_duration')
             )
             
             print("=" * 50)
             print("BACKUP DE ARQUIVOS CONCLUÍDO!")
             print(f"Dados armazenados na sessão:")
             print(f"  - Arquivos de documentos: {data.get('total_files', 0)}")
+            if data.get('backup_type') == 'incremental':
+                print(f"  - Copiados: {data.get('copied_files', 0)} / Inalterados: {data.get('skipped_files', 0)}")
+                print(f"  - Removidos da origem: {data.get('deleted_files', 0)}")
+            if data.get('excluded_files') or data.get('excluded_dirs'):
+                print(f"  - Ignorados pelas regras: {data.get('excluded_files', 0)} arquivos "
+                      f"({data.get('excluded_size', 0) / (1024 * 1024):.2f} MB), {data.get('excluded_dirs', 0)} pastas")
+            if data.get('compression_ratio') is not None:
+                print(f"  - Compressão: {data['compression_ratio']:.2%} do original em {data.get('compression_time', 0):.1f}s")
             print(f"  - Tamanho total (GB): {total_size_gb:.2f}")
             print(f"  - Tamanho total (bytes): {total_size_bytes}")
             print(f"  - Origem: {self.screen.ids.source_path_input.text}")
@@ -72,6 +119,30 @@ class BackupLogObserver(Observer):
             
             # Habilita o botão Next quando o backup é concluído
             self.screen.ids.next_button.disabled = False
+        elif event_type == "operation_finished":
+            # Execução em segundo plano terminou (sucesso, erro ou cancelamento)
+            if hasattr(self.screen, 'on_operation_finished'):
+                self.screen.on_operation_finished(data.get('success', False))
+        elif event_type == "backup_paused":
+            self.update_status('copy_status', 'Backup pausado.', False)
+        elif event_type == "backup_resumed":
+            self.update_status('copy_status', 'Copiando arquivos...', True)
+        elif event_type == "backup_cancelled":
+            self.update_status(
+                'finish_status',
+                f"Backup cancelado — {data.get('copied_files', 0)} de {data.get('total_files', 0)} arquivos copiados.",
+                False
+            )
+        elif event_type == "restore_completed":
+            duration = data.get('duration', 0)
+            hours, remainder = divmod(int(duration), 3600)
+            minutes, seconds = divmod(remainder, 60)
+            message = (f"Restauração finalizada — {data.get('restored_files', 0)} arquivo(s) em "
+                       f"{data.get('target_path', '')}, duração: {hours:02d}:{minutes:02d}:{seconds:02d}")
+            failed = data.get('failed_files', 0)
+            if failed:
+                message += f" ({failed} falha(s))"
+            self.update_status('finish_status', message, not failed)
         elif event_type == "error":
             error_type = data.get('error_type', '')
             if error_type == 'auth_error':
@@ -95,32 +166,204 @@ class BackupLogObserver(Observer):
         self.screen.ids.error_status.text = message
         self.screen.ids.error_status.color = (1, 0.2, 0.2, 1)  # Vermelho
 
-    def update_status(self, label_id, message, success=True):
+    def update_status(self, label_id, message, success=True, log=True):
         """Atualiza o status de um label específico"""
-        self.log_manager.log_info(message)
+        if log:
+            self.log_manager.log_info(message)
         if label_id in self.screen.ids:
             label = self.screen.ids[label_id]
             label.text = message
             label.color = (0.11, 0.55, 0.27, 1) if success else (1, 0.2, 0.2, 1)
             
+class QueuedObserver(Observer):
+    """Entrega na thread da interface os eventos gerados na thread do backup.
+
+    update() apenas enfileira; drain() deve ser agendado na thread da
+    interface (ex.: Clock.schedule_interval). A cada drain só o último
+    progress_update pendente é entregue, os demais eventos todos, em ordem."""
+
+    # Limite de eventos por drain para não travar um quadro da interface
+    MAX_EVENTS_PER_DRAIN = 500
+
+    def __init__(self, observer):
+        self.observer = observer
+        self._queue = queue.SimpleQueue()
+
+    def update(self, event_type: str, data: Dict[str, Any]):
+        self._queue.put((event_type, data))
+
+    def drain(self, dt=None):
+        events = []
+        for _ in range(self.MAX_EVENTS_PER_DRAIN):
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        last_progress = max((i for i, (event_type, _) in enumerate(events) if event_type == "progress_update"),
+                            default=None)
+        for i, (event_type, data) in enumerate(events):
+            if event_type == "progress_update" and i != last_progress:
+                continue
+            try:
+                self.observer.update(event_type, data)
+            except Exception as e:
+                print(f"Erro ao notificar observador: {e}")
+
+# Despacho assíncrono: eventos de progresso podem ser descartados (o mais antigo
+# sai quando a fila enche); os demais, como error e backup_completed, nunca
+DROPPABLE_EVENTS = frozenset({"progress_update", "file_copied"})
+DEFAULT_DISPATCH_QUEUE_SIZE = 256
+DISPATCH_MODES = ('sync', 'async')
+
+class ObserverDispatcher:
+    """Fila limitada e thread de entrega de um observador no modo assíncrono.
+
+    put() nunca bloqueia quem notifica: com a fila cheia, um evento de
+    progresso descarta o progresso mais antigo pendente (ou a si mesmo, se
+    só houver eventos que não podem ser perdidos); os demais eventos sempre
+    entram, mesmo acima do limite. A entrega preserva a ordem."""
+
+    def __init__(self, observer, maxsize: int = DEFAULT_DISPATCH_QUEUE_SIZE):
+        self.observer = observer
+        self.maxsize = max(1, maxsize)
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._thread = threading.Thread(
+            target=self._run, name=f'observer-{type(observer).__name__}', daemon=True
+        )
+        self._thread.start()
+
+    def put(self, event_type: str, data: Dict[str, Any]) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            if event_type in DROPPABLE_EVENTS and len(self._queue) >= self.maxsize:
+                for i, (queued_type, _, _) in enumerate(self._queue):
+                    if queued_type in DROPPABLE_EVENTS:
+                        del self._queue[i]
+                        break
+                else:
+                    self.dropped += 1
+                    return
+                self.dropped += 1
+            self._queue.append((event_type, data, time.monotonic()))
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                event_type, data, queued_at = self._queue.popleft()
+                self._busy = True
+            lag = time.monotonic() - queued_at
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            try:
+                self.observer.update(event_type, data)
+            except Exception as e:
+                print(f"Erro ao notificar observador: {e}")
+            with self._condition:
+                self.delivered += 1
+                self._busy = False
+                self._condition.notify_all()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Aguarda a entrega de tudo que está na fila"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self, timeout: float = None) -> None:
+        """Entrega os eventos pendentes e encerra a thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Atraso da fila: idade do evento pendente mais antigo e o atraso
+        (enfileiramento até a entrega) do último e do pior evento entregue"""
+        with self._condition:
+            pending = len(self._queue)
+            oldest = time.monotonic() - self._queue[0][2] if self._queue else 0.0
+        return {
+            "pending": pending,
+            "queue_lag": oldest,
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
 class BackupSubject:
-    """Classe base para objetos que podem ser observados"""
+    """Classe base para objetos que podem ser observados.
+
+    No modo 'sync' (padrão) os observadores são chamados na thread que
+    notifica; no modo 'async' cada um recebe os eventos pela sua própria
+    fila e thread (ObserverDispatcher), sem atrasar a cópia."""
     def __init__(self):
         self._observers: List[object] = []
+        self._dispatch_mode = 'sync'
+        self._dispatch_queue_size = DEFAULT_DISPATCH_QUEUE_SIZE
+        self._dispatchers: Dict[int, ObserverDispatcher] = {}
     
     def attach(self, observer: object):
         """Anexa um observador que implementa o método update"""
         if observer not in self._observers and hasattr(observer, 'update'):
             self._observers.append(observer)
+            if self._dispatch_mode == 'async':
+                self._dispatchers[id(observer)] = ObserverDispatcher(observer, self._dispatch_queue_size)
     
     def detach(self, observer: object):
         if observer in self._observers:
             self._observers.remove(observer)
+            dispatcher = self._dispatchers.pop(id(observer), None)
+            if dispatcher is not None:
+                dispatcher.close()
+
+    def set_dispatch_mode(self, mode: str, queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE) -> None:
+        """Alterna entre entrega síncrona e assíncrona para os observadores anexados"""
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"Modo de notificação inválido: {mode}")
+        if mode == self._dispatch_mode and queue_size == self._dispatch_queue_size:
+            return
+        # Entrega o que estava pendente antes de trocar as filas
+        for dispatcher in self._dispatchers.values():
+            dispatcher.close()
+        self._dispatchers = {}
+        self._dispatch_mode = mode
+        self._dispatch_queue_size = queue_size
+        if mode == 'async':
+            for observer in self._observers:
+                self._dispatchers[id(observer)] = ObserverDispatcher(observer, queue_size)
+
+    def flush_observers(self, timeout: float = None) -> None:
+        """No modo assíncrono, aguarda a entrega dos eventos pendentes"""
+        for dispatcher in list(self._dispatchers.values()):
+            dispatcher.flush(timeout)
+
+    def dispatch_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas de fila por observador (vazio no modo síncrono)"""
+        return {
+            type(dispatcher.observer).__name__: dispatcher.metrics()
+            for dispatcher in list(self._dispatchers.values())
+        }
     
     def _notify_observers(self, event_type: str, data: Dict[str, Any]):
         for observer in self._observers:
+            dispatcher = self._dispatchers.get(id(observer))
+            if dispatcher is not None:
+                dispatcher.put(event_type, data)
+                continue
             try:
                 observer.update(event_type, data)
             except Exception as e:
                 print(f"Erro ao notificar observador: {e}")
-                
\ No newline at end of file